@@ -0,0 +1,125 @@
+"""
+Background file writer that batches small saves off the event loop
+"""
+
+import asyncio
+
+
+def _write_file(path, data):
+    """Write bytes or text to path in a single blocking call"""
+    if isinstance(data, str):
+        with open(path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write(data)
+    else:
+        with open(path, 'wb', buffering=1 << 16) as f:
+            f.write(data)
+
+
+class AsyncWriter:
+    """Queue (path, data) writes and flush them to disk in batches
+
+    A single background task drains the queue; each batch is written in one
+    worker-thread hop (or one io_uring submission), so many small files cost
+    one executor round trip instead of one each.
+    """
+
+    # Maximum number of queued writes handled per batch
+    BATCH_SIZE = 64
+
+    def __init__(self, logger=None, known_dirs=None, on_written=None, uring=None, max_queue=256):
+        """
+        Args:
+            logger: Logger instance
+            known_dirs: Set of directories already created, shared with the caller
+            on_written: Called with each path once its data is on disk
+            uring: Started UringWriter to submit batches through, if any
+            max_queue: Queued writes before write() waits for the writer to catch up
+        """
+        self.logger = logger
+        self.known_dirs = known_dirs if known_dirs is not None else set()
+        self.on_written = on_written
+        self.uring = uring
+        self.max_queue = max_queue
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """Start the background writer task on the running loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def write(self, path, data):
+        """
+        Queue data to be written to path
+
+        Args:
+            path: Destination Path; missing parent directories are created
+            data: Content to write (str is written as UTF-8)
+        """
+        await self._queue.put((path, data))
+
+    async def flush(self):
+        """Wait until all queued writes have reached disk"""
+        if self._queue:
+            await self._queue.join()
+
+    async def close(self):
+        """Flush queued writes and stop the background task"""
+        if self._task:
+            await self.flush()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Writer loop: take whatever is queued, up to BATCH_SIZE, and write it together"""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                if self.uring:
+                    await asyncio.to_thread(self._create_dirs, batch)
+                    # Submit the whole batch at once so it shares a single io_uring_enter
+                    results = await asyncio.gather(
+                        *(self.uring.write(path, data) for path, data in batch),
+                        return_exceptions=True
+                    )
+                else:
+                    results = await asyncio.to_thread(self._write_batch, batch)
+
+                for (path, _), error in zip(batch, results):
+                    if error is None:
+                        if self.on_written:
+                            self.on_written(path)
+                    elif self.logger:
+                        self.logger.warning(f"Failed to write {path}: {str(error)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        """Create directories and write every file in batch (run in a worker thread)"""
+        self._create_dirs(batch)
+        results = []
+        for path, data in batch:
+            try:
+                _write_file(path, data)
+                results.append(None)
+            except OSError as e:
+                results.append(e)
+        return results
+
+    def _create_dirs(self, batch):
+        """Create the parent directories of batch not created yet (run in a worker thread)"""
+        for directory in {path.parent for path, _ in batch} - self.known_dirs:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                self.known_dirs.add(directory)
+            except OSError as e:
+                if self.logger:
+                    self.logger.warning(f"Failed to create directory {directory}: {str(e)}")
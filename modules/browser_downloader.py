@@ -3,57 +3,267 @@ Browser-based downloader using Playwright for better bot detection avoidance
 """
 
 import asyncio
+import os
 import random
+import re
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlparse, unquote
 import mimetypes
-import aiofiles
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from playwright_stealth import Stealth
 from tqdm.asyncio import tqdm
 
+from .rate_limiter import RateLimiter
+from .async_writer import AsyncWriter
+from .uring_writer import UringWriter
+from .utils import load_json_index, save_json_index, scan_files
 from .wayback_api import WaybackAPI
 
 
+# Realistic user agents to pick from per browser context
+_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+)
+
+# Common desktop viewport sizes
+_VIEWPORTS = (
+    {'width': 1920, 'height': 1080},
+    {'width': 1366, 'height': 768},
+    {'width': 1440, 'height': 900},
+    {'width': 1536, 'height': 864},
+)
+
+# Chromium launch flags that reduce automation fingerprints
+_LAUNCH_ARGS = (
+    '--disable-blink-features=AutomationControlled',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-site-isolation-trials',
+    '--disable-web-security',
+    '--disable-features=BlockInsecurePrivateNetworkRequests',
+    # Pages are only rendered to capture HTML; images are fetched separately
+    '--blink-settings=imagesEnabled=false',
+)
+
+
+def _scan_output_dir(output_dir, logger=None):
+    """Return the set of files under output_dir as relative path strings"""
+    prefix = len(os.path.join(str(output_dir), ''))
+    return {path[prefix:] for path in scan_files(output_dir, logger)}
+
+
+def _sync_write(path, data):
+    """Write bytes or text to path in a single blocking call"""
+    if isinstance(data, str):
+        path.write_text(data, encoding='utf-8')
+    else:
+        path.write_bytes(data)
+
+
+# Path and query of a plain http(s) URL, matched in one pass; anything unusual
+# (other schemes, bracketed or non-ASCII hosts, tabs or newlines) goes through urlparse
+_URL_RE = re.compile(
+    r'^https?://[\w.:@%!$&\'()*+,;=~-]*(?P<path>(?:/[^?#\t\r\n]*)?)'
+    r'(?:\?(?P<q>[^#\t\r\n]*))?(?:#[^\t\r\n]*)?\Z',
+    re.ASCII
+)
+
+# Query characters replaced to make the query safe inside a filename
+_QUERY_TABLE = str.maketrans('&=', '__')
+
+
+def _path_name(path):
+    """Final component of a relative path the way Path.name reports it ('.' and empty parts are skipped)"""
+    name = path.rpartition('/')[2]
+    if name and name != '.':
+        return name
+    for part in reversed(path.split('/')):
+        if part and part != '.':
+            return part
+    return ''
+
+
+def _split_suffix(name):
+    """Split a filename into stem and suffix the way Path.stem/Path.suffix do"""
+    dot = name.rfind('.')
+    if 0 < dot < len(name) - 1:
+        return name[:dot], name[dot:]
+    return name, ''
+
+
+@lru_cache(maxsize=65536)
+def _compute_path(url, is_main, output_dir_str):
+    """
+    Compute the local file path for URL
+    
+    Args:
+        url: Original URL
+        is_main: Whether this is the main file
+        output_dir_str: Output directory as a string
+        
+    Returns:
+        Local file path as a string (hashable, so results can be cached)
+    """
+    match = _URL_RE.match(url)
+    if match:
+        raw_path, query = match.group('path'), match.group('q')
+        # Drop ;params from the last segment, as urlparse does
+        params = raw_path.find(';', raw_path.rfind('/') + 1)
+        if params >= 0:
+            raw_path = raw_path[:params]
+    else:
+        parsed = urlparse(url)
+        raw_path, query = parsed.path, parsed.query
+    
+    # Get path components
+    path = unquote(raw_path)
+    if not path or path == '/':
+        path = 'index.html'
+    elif path.endswith('/'):
+        path = path[1:] + 'index.html' if path[0] == '/' else path + 'index.html'
+    elif path[0] == '/':
+        path = path[1:]
+    
+    # Handle query parameters in filename
+    if query:
+        base, ext = _split_suffix(_path_name(path))
+        path = f"{base}_{query.translate(_QUERY_TABLE)}{ext}"
+    
+    # Default to .html for pages without extension
+    if not _split_suffix(_path_name(path))[1]:
+        path += '.html'
+    
+    # Construct full path
+    return str(Path(output_dir_str) / path)
+
+
 class BrowserDownloader:
     """Handle downloads using a real browser engine (Playwright)"""
     
-    def __init__(self, output_dir, logger=None, headless=False, proxy=None):
+    # Maximum number of download results kept in the in-process URL cache
+    MAX_CACHE = 4096
+    
+    # File in output_dir recording assets that failed permanently, and how long to trust it
+    FAILURES_FILE = '.wbd_failures.json'
+    FAILURE_TTL = 7 * 86400
+    
+    # File in output_dir mapping asset URLs to [ETag, Last-Modified] for revalidation
+    VALIDATORS_FILE = '.etags.json'
+    
+    # Statuses treated as permanent failures worth remembering across runs
+    PERMANENT_FAILURE_STATUSES = frozenset({404, 410})
+    
+    # Retry backoff bounds in seconds, and 4xx statuses that are worth retrying
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    RETRY_STATUSES = frozenset({408, 429})
+    
+    # Markers of a rate-limit notice, checked at the start of the HTML
+    CHALLENGE_MARKERS = ('Rate limit',)
+    
+    # Resource types aborted while rendering pages (assets are fetched separately)
+    BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'websocket', 'ping'})
+    BLOCKED_EXTENSIONS = (
+        '.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2', '.ttf', '.mp4', '.css'
+    )
+    
+    def __init__(self, output_dir, logger=None, headless=False, proxy=None, max_concurrent=1,
+                 rate_limit=5.0, simulate_behavior=False, revalidate=False, use_uring=False,
+                 burst=1):
         self.output_dir = Path(output_dir)
         self.logger = logger
         self.headless = headless
+        self.simulate_behavior = simulate_behavior
+        self.revalidate = revalidate
+        self.use_uring = use_uring
         self.proxy = proxy
+        self.max_concurrent = max(1, max_concurrent)
         self.wayback_api = WaybackAPI()
         
+        # Global request pacing shared by all concurrent downloads, with light human jitter
+        self.rate_limiter = RateLimiter(rate_limit, jitter=0.1, burst=burst)
+        
         # Browser instances
         self.playwright = None
         self.browser = None
         self.context = None
+        self.http = None
         
         # Statistics
         self.downloaded = 0
         self.failed = 0
         self.skipped = 0
         
-        # Request tracking
-        self.last_request_time = 0
-        self.request_count = 0
+        # LRU of wayback URL -> future holding the download result, so repeated
+        # and concurrent requests for the same URL share a single fetch
+        self._url_cache = OrderedDict()
+        
+        # Number of page renders in progress; resource blocking is active while > 0
+        self._rendering_pages = 0
+        
+        # Reusable pages for download_page, created on enter
+        self._page_pool = None
+        self._pool_pages = []
+        
+        # Background asset writer, started on enter
+        self._writer = None
+        
+        # io_uring write backend, set on enter when requested and supported
+        self._uring = None
+        
+        # Directories created during this run, so each is only created once
+        self._known_dirs = set()
+        
+        # Relative paths of files already in output_dir, populated on enter
+        self._on_disk = set()
+        
+        # Wayback URL -> time of last permanent failure, persisted between runs
+        self._neg_cache = {}
+        
+        # Wayback URL -> [ETag, Last-Modified] of the saved asset, persisted between runs
+        self._validators = {}
     
     async def __aenter__(self):
         """Initialize browser and context"""
         self.playwright = await async_playwright().start()
         
+        # Index existing files once so resume checks avoid a stat per URL
+        self._on_disk = await asyncio.get_running_loop().run_in_executor(
+            None, _scan_output_dir, self.output_dir, self.logger
+        )
+        
+        # Load URLs known to be missing and validators of saved assets from previous runs
+        self._neg_cache = self._load_failures()
+        self._validators = load_json_index(self.output_dir / self.VALIDATORS_FILE)
+        
+        # Batch asset writes through io_uring where available, else use the thread pool
+        if self.use_uring:
+            uring = UringWriter(self.logger)
+            if uring.start():
+                self._uring = uring
+            elif self.logger:
+                self.logger.info("io_uring not available, falling back to threaded writes")
+        
+        # Start background writer so asset saves overlap with the next fetch
+        self._writer = AsyncWriter(
+            self.logger,
+            self._known_dirs,
+            lambda path: self._on_disk.add(self._disk_key(path)),
+            uring=self._uring
+        )
+        self._writer.start()
+        
         # Browser launch options
         launch_options = {
             'headless': self.headless,
-            'args': [
-                '--disable-blink-features=AutomationControlled',
-                '--disable-features=IsolateOrigins,site-per-process',
-                '--disable-site-isolation-trials',
-                '--disable-web-security',
-                '--disable-features=BlockInsecurePrivateNetworkRequests',
-            ]
+            'args': list(_LAUNCH_ARGS)
         }
         
         # Add proxy if provided
@@ -74,13 +284,7 @@ class BrowserDownloader:
         self.browser = await self.playwright.chromium.launch(**launch_options)
         
         # Create context with browser-like settings
-        viewport_sizes = [
-            {'width': 1920, 'height': 1080},
-            {'width': 1366, 'height': 768},
-            {'width': 1440, 'height': 900},
-            {'width': 1536, 'height': 864}
-        ]
-        viewport = random.choice(viewport_sizes)
+        viewport = random.choice(_VIEWPORTS)
         
         context_options = {
             'viewport': viewport,
@@ -112,10 +316,44 @@ class BrowserDownloader:
             }
         ])
         
+        # Abort heavy subresources while rendering pages
+        await self.context.route('**/*', self._route_request)
+        
+        # Lightweight HTTP client for asset downloads; no renderer involved, but it
+        # shares the browser context's user agent, headers, cookies and proxy
+        http_options = {
+            'user_agent': context_options['user_agent'],
+            'extra_http_headers': context_options['extra_http_headers'],
+            'storage_state': await self.context.storage_state(),
+        }
+        if self.proxy:
+            http_options['proxy'] = proxy_config
+        self.http = await self.playwright.request.new_context(**http_options)
+        
+        # Open one reusable page per concurrent worker
+        self._page_pool = asyncio.Queue()
+        for _ in range(self.max_concurrent):
+            page = await self.context.new_page()
+            self._pool_pages.append(page)
+            self._page_pool.put_nowait(page)
+        
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Clean up browser resources"""
+        if self._writer:
+            await self._writer.close()
+        if self._uring:
+            self._uring.close()
+        self._save_indexes()
+        if self.http:
+            await self.http.dispose()
+        for page in self._pool_pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._pool_pages.clear()
         if self.context:
             await self.context.close()
         if self.browser:
@@ -123,52 +361,55 @@ class BrowserDownloader:
         if self.playwright:
             await self.playwright.stop()
     
+    async def flush_writes(self):
+        """Wait until all queued asset writes have reached disk"""
+        if self._writer:
+            await self._writer.flush()
+    
+    def _is_blocked(self, request):
+        """Check whether a subresource request is skipped during page renders"""
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+            return True
+        return urlparse(request.url).path.lower().endswith(self.BLOCKED_EXTENSIONS)
+    
+    async def _route_request(self, route):
+        """Abort blocked subresources during page renders, continue everything else"""
+        if self._rendering_pages and self._is_blocked(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+    
     def _get_random_user_agent(self):
         """Get a random realistic user agent"""
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        ]
-        return random.choice(user_agents)
-    
-    async def _apply_human_delay(self):
-        """Apply human-like delay between actions"""
-        current_time = time.time()
-        self.request_count += 1
-        
-        # Base delay range (1 to 3 seconds for browser)
-        min_delay = 1.0
-        max_delay = 3.0
-        
-        # Every 5 requests, add a longer pause
-        if self.request_count % 5 == 0:
-            min_delay = 3.0
-            max_delay = 7.0
-            if self.logger:
-                self.logger.debug(f"Applied longer pause after {self.request_count} requests")
-        
-        # Calculate time since last request
-        time_since_last = current_time - self.last_request_time
-        
-        # Generate random delay with some variance
-        target_delay = random.uniform(min_delay, max_delay)
-        
-        # Add small random micro-pauses to simulate thinking
-        if random.random() < 0.3:
-            target_delay += random.uniform(0.5, 1.5)
-        
-        # Only sleep if we haven't waited long enough
-        if time_since_last < target_delay:
-            sleep_time = target_delay - time_since_last
-            await asyncio.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        return random.choice(_USER_AGENTS)
+    
+    def _retry_delay(self, attempt):
+        """Exponential backoff with full jitter for the given retry attempt"""
+        return random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** attempt)))
+    
+    def _is_challenge(self, content):
+        """Check whether page content carries a rate-limit notice"""
+        head = content[:4096]
+        if isinstance(head, bytes):
+            head = head.decode('utf-8', errors='ignore')
+        return any(marker in head for marker in self.CHALLENGE_MARKERS)
+    
+    async def _read_page_content(self, page, response):
+        """Return the archived HTML byte-for-byte, or the rendered DOM when the body is unusable"""
+        if response and 'html' in response.headers.get('content-type', ''):
+            try:
+                return await response.body()
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"Response body unavailable, using rendered DOM: {str(e)}")
+        return await page.content()
     
     async def _simulate_human_behavior(self, page: Page):
         """Simulate human-like behavior on the page"""
+        # Mouse and scroll events buy nothing without a visible window
+        if self.headless:
+            return
+        
         try:
             # Random mouse movements
             for _ in range(random.randint(2, 4)):
@@ -192,6 +433,59 @@ class BrowserDownloader:
             if self.logger:
                 self.logger.debug(f"Error simulating human behavior: {str(e)}")
     
+    async def _cached(self, key, fetch):
+        """
+        Return the cached result for key, or run fetch() and cache its result
+        
+        Concurrent callers for the same key await the same in-flight fetch.
+        Failed results (first item falsy) and errors raised by fetch() are
+        handed to waiting callers but not kept, so a later call retries the
+        download.
+        
+        Args:
+            key: Cache key
+            fetch: Coroutine function performing the download
+            
+        Returns:
+            Result of fetch()
+        """
+        future = self._url_cache.get(key)
+        if future is not None:
+            self._url_cache.move_to_end(key)
+            self.skipped += 1
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._url_cache[key] = future
+        if len(self._url_cache) > self.MAX_CACHE:
+            self._evict_oldest()
+        
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            self._url_cache.pop(key, None)
+            future.cancel()
+            raise
+        except Exception as e:
+            # Waiting callers get the same error, not a cancellation
+            self._url_cache.pop(key, None)
+            future.set_exception(e)
+            # Retrieve it here so a future nobody else awaited doesn't log a warning
+            future.exception()
+            raise
+        
+        future.set_result(result)
+        if not result[0]:
+            self._url_cache.pop(key, None)
+        return result
+    
+    def _evict_oldest(self):
+        """Drop the least recently used finished entry; in-flight downloads stay shared"""
+        for key, future in self._url_cache.items():
+            if future.done():
+                del self._url_cache[key]
+                return
+    
     async def download_page(self, wayback_url, original_url, is_main=False):
         """
         Download a page using browser
@@ -204,14 +498,18 @@ class BrowserDownloader:
         Returns:
             Tuple of (content, file_path) or (None, None) on failure
         """
+        return await self._cached(
+            ('page', wayback_url),
+            lambda: self._download_page(wayback_url, original_url, is_main)
+        )
+    
+    async def _download_page(self, wayback_url, original_url, is_main):
+        """Download a page using browser, bypassing the URL cache"""
         page = None
         try:
-            # Apply human-like delay
-            await self._apply_human_delay()
-            
             # Check if file already exists
             file_path = self._determine_file_path(original_url, is_main)
-            if file_path.exists():
+            if self._disk_key(file_path) in self._on_disk:
                 self.skipped += 1
                 if self.logger:
                     self.logger.debug(f"File already exists, skipping: {file_path}")
@@ -221,8 +519,12 @@ class BrowserDownloader:
                 if content is not None:
                     return content, file_path
             
-            # Create new page with timeout
-            page = await self.context.new_page()
+            # Wait for a request slot
+            await self.rate_limiter.acquire()
+            
+            # Borrow a page from the pool
+            page = await self._page_pool.get()
+            self._rendering_pages += 1
             
             # Set extra headers for this specific request
             await page.set_extra_http_headers({
@@ -230,7 +532,10 @@ class BrowserDownloader:
                 'Cache-Control': 'no-cache',
             })
             
-            # Navigate with retry logic
+            # Navigate with retry logic; only timeouts, rate limits and server errors are retried
+            response = None
+            status = None
+            rate_limited = False
             max_retries = 3
             for attempt in range(max_retries):
                 try:
@@ -240,46 +545,77 @@ class BrowserDownloader:
                         wait_until='domcontentloaded',
                         timeout=60000  # 60 seconds timeout
                     )
-                    
-                    if response and response.status == 200:
-                        break
-                    elif response and response.status == 429:
-                        # Rate limited
-                        if attempt < max_retries - 1:
-                            wait_time = (attempt + 1) * 5 + random.uniform(0, 5)
-                            if self.logger:
-                                self.logger.warning(f"Rate limited (429), waiting {wait_time:.1f}s")
-                            await asyncio.sleep(wait_time)
-                            continue
-                    else:
-                        if self.logger:
-                            self.logger.warning(f"Unexpected status: {response.status if response else 'No response'}")
-                        
                 except Exception as e:
                     if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 3 + random.uniform(0, 3)
+                        wait_time = self._retry_delay(attempt)
                         if self.logger:
                             self.logger.warning(f"Navigation error, retrying in {wait_time:.1f}s: {str(e)}")
                         await asyncio.sleep(wait_time)
                         continue
-                    else:
-                        raise
+                    raise
+                
+                status = response.status if response else None
+                if status == 200:
+                    self.rate_limiter.recover()
+                    break
+                
+                if status == 429:
+                    # Rate limited - slow down every request, not just this one
+                    rate_limited = True
+                    self.rate_limiter.slow_down()
+                
+                if status in self.RETRY_STATUSES or (status and status >= 500):
+                    if attempt < max_retries - 1:
+                        wait_time = self._retry_delay(attempt)
+                        if self.logger:
+                            self.logger.warning(f"Got status {status}, retrying in {wait_time:.1f}s")
+                        await asyncio.sleep(wait_time)
+                        continue
+                
+                if self.logger:
+                    self.logger.warning(f"Unexpected status: {status if status else 'No response'}")
+                break
+            
+            # Never save an error or rate-limit response as the archived page
+            if status is not None and not 200 <= status < 300:
+                self.failed += 1
+                return None, None
+            
+            # Wait briefly for network to settle; Wayback pages often never reach idle
+            try:
+                await page.wait_for_load_state('networkidle', timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
             
-            # Wait for content to load
-            await page.wait_for_load_state('networkidle', timeout=30000)
+            # Act human before reading the page when asked to, so the saved content reflects it
+            if self.simulate_behavior:
+                await self._simulate_human_behavior(page)
             
-            # Simulate human behavior
-            await self._simulate_human_behavior(page)
+            content = await self._read_page_content(page, response)
             
-            # Get page content
-            content = await page.content()
+            # When Wayback pushed back on this page or it shows a rate-limit notice, act
+            # human; a noticed page is then loaded once more, keeping the first copy
+            # unless the reload succeeds
+            challenged = self._is_challenge(content)
+            if (rate_limited or challenged) and not self.simulate_behavior:
+                await self._simulate_human_behavior(page)
+            if challenged:
+                try:
+                    retry = await page.goto(wayback_url, wait_until='domcontentloaded', timeout=60000)
+                    if retry and 200 <= retry.status < 300:
+                        content = await self._read_page_content(page, retry)
+                except Exception as e:
+                    if self.logger:
+                        self.logger.debug(f"Reload after rate-limit notice failed, keeping first copy: {str(e)}")
             
             # Create directory
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(file_path.parent)
             
-            # Save content
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(content)
+            # Save content with a single executor hop
+            await asyncio.get_running_loop().run_in_executor(
+                None, _sync_write, file_path, content
+            )
+            self._on_disk.add(self._disk_key(file_path))
             
             self.downloaded += 1
             if self.logger:
@@ -295,7 +631,24 @@ class BrowserDownloader:
         
         finally:
             if page:
+                self._rendering_pages -= 1
+                await self._release_page(page)
+    
+    async def _release_page(self, page):
+        """Reset a borrowed page and return it to the pool, replacing it if unusable"""
+        try:
+            await page.goto('about:blank')
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Replacing unusable browser page: {str(e)}")
+            self._pool_pages.remove(page)
+            try:
                 await page.close()
+            except Exception:
+                pass
+            page = await self.context.new_page()
+            self._pool_pages.append(page)
+        self._page_pool.put_nowait(page)
     
     async def download_asset(self, wayback_url, original_url):
         """
@@ -308,62 +661,96 @@ class BrowserDownloader:
         Returns:
             Tuple of (success, file_path) or (False, None) on failure
         """
-        page = None
+        return await self._cached(
+            ('asset', wayback_url),
+            lambda: self._download_asset(wayback_url, original_url)
+        )
+    
+    async def _download_asset(self, wayback_url, original_url):
+        """Download an asset using browser's network, bypassing the URL cache"""
         try:
-            # Apply delay
-            await self._apply_human_delay()
-            
             # Determine file path
             file_path = self._determine_file_path(original_url, is_main=False)
             
-            # Check if already exists
-            if file_path.exists():
+            # Check if already exists; with revalidation, ask the server only when
+            # we have validators to make the request conditional
+            headers = {}
+            if self._disk_key(file_path) in self._on_disk:
+                validators = self._validators.get(wayback_url) if self.revalidate else None
+                if not validators:
+                    self.skipped += 1
+                    return True, file_path
+                
+                etag, last_modified = validators
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+            
+            # Skip URLs that recently failed permanently
+            failed_at = self._neg_cache.get(wayback_url)
+            if failed_at is not None and time.time() - failed_at < self.FAILURE_TTL:
                 self.skipped += 1
-                return True, file_path
+                if self.logger:
+                    self.logger.debug(f"Skipping known missing asset: {wayback_url}")
+                return False, None
             
-            # Create page for download
-            page = await self.context.new_page()
+            # Wait for a request slot
+            await self.rate_limiter.acquire()
             
-            # Use page's request context to download
-            response = await page.request.get(wayback_url)
+            # Fetch through the standalone HTTP client, no browser page needed
+            response = await self.http.get(wayback_url, headers=headers or None)
             
-            if response.status == 200:
-                content = await response.body()
-                
-                # Create directory
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Save file
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(content)
-                
-                self.downloaded += 1
-                if self.logger:
-                    self.logger.debug(f"Downloaded asset: {file_path}")
+            try:
+                if response.status == 304:
+                    # Saved copy is still current
+                    self.rate_limiter.recover()
+                    self.skipped += 1
+                    return True, file_path
                 
-                return True, file_path
-            else:
-                if self.logger:
-                    self.logger.warning(f"Failed to download asset {wayback_url}: {response.status}")
-                self.failed += 1
-                return False, None
+                if response.status == 200:
+                    self.rate_limiter.recover()
+                    content = await response.body()
+                    
+                    # Remember validators so a later run can revalidate cheaply
+                    etag = response.headers.get('etag')
+                    last_modified = response.headers.get('last-modified')
+                    if etag or last_modified:
+                        self._validators[wayback_url] = [etag, last_modified]
+                    
+                    # Hand off to the background writer
+                    await self._writer.write(file_path, content)
+                    
+                    self.downloaded += 1
+                    if self.logger:
+                        self.logger.debug(f"Downloaded asset: {file_path}")
+                    
+                    return True, file_path
+                else:
+                    if response.status == 429:
+                        self.rate_limiter.slow_down()
+                    if response.status in self.PERMANENT_FAILURE_STATUSES:
+                        self._neg_cache[wayback_url] = time.time()
+                    if self.logger:
+                        self.logger.warning(f"Failed to download asset {wayback_url}: {response.status}")
+                    self.failed += 1
+                    return False, None
+            finally:
+                # The request context lives for the whole run; free the buffered body now
+                await response.dispose()
                 
         except Exception as e:
             if self.logger:
                 self.logger.warning(f"Error downloading asset {wayback_url}: {str(e)}")
             self.failed += 1
             return False, None
-        
-        finally:
-            if page:
-                await page.close()
     
     async def download_assets_batch(self, assets):
         """
         Download multiple assets with progress bar
         
         Args:
-            assets: List of asset dictionaries
+            assets: List of Asset tuples
         """
         # Filter out None assets
         valid_assets = [a for a in assets if a is not None]
@@ -372,23 +759,43 @@ class BrowserDownloader:
         progress_bar = tqdm(
             total=len(valid_assets),
             desc="Downloading assets",
-            unit="files"
+            unit="files",
+            mininterval=0.2,
+            miniters=16
         )
         
-        # Download assets sequentially (browser mode is already slower)
-        for asset in valid_assets:
-            try:
-                await self.download_asset(
-                    asset['wayback_url'],
-                    asset['original_url']
-                )
-            except Exception as e:
-                if self.logger:
-                    self.logger.debug(f"Failed to download {asset['wayback_url']}: {str(e)}")
-            finally:
-                progress_bar.update(1)
+        # Download assets concurrently, bounded by max_concurrent in-flight requests
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        # Completed count, rendered by the refresher instead of per asset
+        completed = [0]
+        
+        async def _download_one(asset):
+            async with semaphore:
+                try:
+                    return await self.download_asset(
+                        asset.wayback_url,
+                        asset.original_url
+                    )
+                except Exception as e:
+                    if self.logger:
+                        self.logger.debug(f"Failed to download {asset.wayback_url}: {str(e)}")
+                    return False, None
+                finally:
+                    completed[0] += 1
         
-        progress_bar.close()
+        refresher = asyncio.create_task(self._progress_refresher(progress_bar, completed))
+        try:
+            await asyncio.gather(*(_download_one(asset) for asset in valid_assets))
+        finally:
+            refresher.cancel()
+            try:
+                await refresher
+            except asyncio.CancelledError:
+                pass
+            progress_bar.n = completed[0]
+            progress_bar.refresh()
+            progress_bar.close()
         
         # Log statistics
         if self.logger:
@@ -397,6 +804,21 @@ class BrowserDownloader:
             self.logger.info(f"  Failed: {self.failed}")
             self.logger.info(f"  Skipped: {self.skipped}")
     
+    async def _progress_refresher(self, progress_bar, completed, interval=0.2):
+        """
+        Redraw a progress bar from a shared counter on a fixed interval
+        
+        Args:
+            progress_bar: tqdm instance to update
+            completed: Single-item list holding the completed count
+            interval: Seconds between redraws
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if progress_bar.n != completed[0]:
+                progress_bar.n = completed[0]
+                progress_bar.refresh()
+    
     def _determine_file_path(self, url, is_main):
         """
         Determine local file path for URL
@@ -408,50 +830,41 @@ class BrowserDownloader:
         Returns:
             Path object for local file
         """
-        # Parse URL
-        parsed = urlparse(url)
-        
-        # Get path components
-        path = unquote(parsed.path)
-        if not path or path == '/':
-            path = '/index.html'
-        elif path.endswith('/'):
-            path += 'index.html'
-        
-        # Remove leading slash
-        if path.startswith('/'):
-            path = path[1:]
-        
-        # Handle query parameters in filename
-        if parsed.query:
-            # Replace special characters
-            query_safe = parsed.query.replace('&', '_').replace('=', '_')
-            base, ext = Path(path).stem, Path(path).suffix
-            path = f"{base}_{query_safe}{ext}"
-        
-        # Ensure file has extension
-        file_path = Path(path)
-        if not file_path.suffix:
-            # Default to .html for pages without extension
-            path += '.html'
-        
-        # Construct full path
-        full_path = self.output_dir / path
-        
-        return full_path
+        return Path(_compute_path(url, is_main, str(self.output_dir)))
+    
+    def _load_failures(self):
+        """Load the persisted failure cache, dropping expired entries"""
+        failures = load_json_index(self.output_dir / self.FAILURES_FILE)
+        now = time.time()
+        return {url: ts for url, ts in failures.items() if now - ts < self.FAILURE_TTL}
+    
+    def _save_indexes(self):
+        """Persist the failure cache and response validators for the next run"""
+        for name, data in ((self.FAILURES_FILE, self._neg_cache),
+                           (self.VALIDATORS_FILE, self._validators)):
+            try:
+                save_json_index(self.output_dir / name, data)
+            except OSError as e:
+                if self.logger:
+                    self.logger.debug(f"Failed to save {name}: {str(e)}")
+    
+    def _ensure_dir(self, directory):
+        """Create directory unless this run already created it"""
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+    
+    def _disk_key(self, file_path):
+        """Key of file_path in the on-disk manifest"""
+        return str(file_path.relative_to(self.output_dir))
     
     async def _read_existing_file(self, file_path):
-        """Read existing file content"""
+        """Read existing file content as bytes in a worker thread"""
         try:
-            # Try to read as text first
-            try:
-                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                    return await f.read()
-            except UnicodeDecodeError:
-                # Read as binary if text fails
-                async with aiofiles.open(file_path, 'rb') as f:
-                    return await f.read()
-        except Exception as e:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, file_path.read_bytes
+            )
+        except OSError as e:
             if self.logger:
                 self.logger.debug(f"Failed to read existing file {file_path}: {str(e)}")
-            return None
\ No newline at end of file
+            return None
@@ -4,21 +4,221 @@ Async downloader for efficient file downloading
 
 import asyncio
 import aiohttp
-import aiofiles
+import os
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlparse, unquote
-import mimetypes
 from tqdm.asyncio import tqdm
-import time
 import random
-from datetime import datetime
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import platform
+import zlib
 
+from .async_writer import AsyncWriter
+from .rate_limiter import RateLimiter
+from .utils import load_json_index, save_json_index, scan_files
 from .wayback_api import WaybackAPI
 
 
+def _decode_text(data, encoding='utf-8'):
+    """Decode text with the given charset, falling back to latin-1 (which accepts any bytes)"""
+    try:
+        return data.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return data.decode('latin-1')
+
+
+class _DeflateDecompressor:
+    """Decompressor for Content-Encoding: deflate, which servers send either zlib-wrapped or raw"""
+    
+    def __init__(self):
+        # Accept zlib (and gzip) framing first, as aiohttp does
+        self._obj = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        
+        # Input consumed before any output, replayed if the body turns out to be raw deflate
+        self._head = b''
+    
+    def decompress(self, data):
+        """Decompress the next piece of the body, switching to raw deflate on a bad header"""
+        try:
+            out = self._obj.decompress(data)
+        except zlib.error:
+            if self._head is None:
+                raise
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            data, self._head = self._head + data, None
+            return self._obj.decompress(data)
+        if self._head is not None:
+            self._head = None if out else self._head + data
+        return out
+    
+    def flush(self):
+        """Return whatever output is still buffered"""
+        return self._obj.flush()
+
+
+def _decompressor(response):
+    """Return a zlib decompressor for a gzip/deflate encoded response, else None"""
+    encoding = response.headers.get('Content-Encoding', '').lower()
+    if encoding in ('gzip', 'x-gzip'):
+        # Accept both gzip and zlib framing
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)
+    if encoding == 'deflate':
+        return _DeflateDecompressor()
+    return None
+
+
+def _inflate(decompressor, data):
+    """Decompress a whole body (run in a worker thread)"""
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+# Most buffers one writev call accepts (POSIX minimum guaranteed by Linux and macOS)
+_IOV_MAX = 1024
+
+
+def _write_chunks(f, chunks, decompressor=None, final=False):
+    """
+    Write body chunks with one vectored write (run in a worker thread)
+    
+    Args:
+        f: Unbuffered binary file
+        chunks: List of byte chunks
+        decompressor: zlib decompressor to pass the chunks through, if encoded
+        final: Whether these are the last chunks, so the decompressor is flushed
+    """
+    if decompressor:
+        chunks = [decompressor.decompress(chunk) for chunk in chunks]
+        if final:
+            chunks.append(decompressor.flush())
+    
+    total = sum(map(len, chunks))
+    fd = f.fileno()
+    written = os.writev(fd, chunks) if hasattr(os, 'writev') and len(chunks) <= _IOV_MAX else 0
+    
+    # Finish short (or non-vectored) writes one call at a time
+    if written < total:
+        rest = memoryview(b''.join(chunks))[written:]
+        while rest:
+            rest = rest[os.write(fd, rest):]
+
+
+# charset in <meta charset=...> or <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def _sniff_meta_charset(data):
+    """Return the charset declared by a <meta> tag near the start of an HTML body, if any"""
+    match = _META_CHARSET_RE.search(data, 0, 2048)
+    return match.group(1).decode('ascii') if match else None
+
+
+def _sync_read(path):
+    """Read a whole file and decode it (run in a worker thread)"""
+    with open(path, 'rb') as f:
+        return _decode_text(f.read())
+
+
+def _parse_retry_after(value):
+    """
+    Parse a Retry-After header
+    
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, 0 if missing or unparseable
+    """
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# Query characters replaced to make the query safe inside a filename
+_QUERY_TR = str.maketrans({'&': '_', '=': '_'})
+
+
+@lru_cache(maxsize=65536)
+def _compute_rel_path(url, is_main):
+    """
+    Compute the path of URL relative to the output directory
+    
+    Args:
+        url: Original URL
+        is_main: Whether this is the main file
+        
+    Returns:
+        Relative path as a string
+    """
+    # Parse URL
+    parsed = urlparse(url)
+    
+    # Get path components
+    path = unquote(parsed.path)
+    if not path or path == '/':
+        path = '/index.html'
+    elif path.endswith('/'):
+        path += 'index.html'
+    
+    # Remove leading slash
+    if path.startswith('/'):
+        path = path[1:]
+    
+    # Handle query parameters in filename
+    if parsed.query:
+        # Replace special characters in one pass
+        query_safe = parsed.query.translate(_QUERY_TR)
+        name = Path(path)
+        path = f"{name.stem}_{query_safe}{name.suffix}"
+    
+    # Default to .html for files without extension, by Path's rule ('foo.' has none);
+    # results are cached per URL, so the Path is built once per URL at most
+    if not Path(path).suffix:
+        path += '.html'
+    
+    return path
+
+
+class _BatchedProgress:
+    """Completion counter for one download_assets call, pushed to its progress bar in batches"""
+    
+    def __init__(self, progress_bar, batch, interval):
+        self.progress_bar = progress_bar
+        self.batch = batch
+        self.interval = interval
+        self.count = 0
+        self.shown = 0
+        self.last_flush = time.monotonic()
+    
+    def tick(self):
+        """Count one finished file, redrawing every batch files or interval seconds"""
+        self.count += 1
+        if self.count % self.batch == 0 or time.monotonic() - self.last_flush > self.interval:
+            self.flush()
+    
+    def flush(self):
+        """Push completions counted since the last flush to the progress bar"""
+        if self.count > self.shown:
+            self.progress_bar.update(self.count - self.shown)
+            self.shown = self.count
+        self.last_flush = time.monotonic()
+
+
 class AsyncDownloader:
-    """Handle asynchronous file downloads"""
+    """Handle asynchronous file downloads (runs fastest on uvloop, if installed)"""
     
     # List of realistic user agents to rotate through
     USER_AGENTS = [
@@ -30,23 +230,77 @@ class AsyncDownloader:
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0'
     ]
     
-    def __init__(self, output_dir, max_concurrent=1, logger=None, proxy=None):
+    # Per-request headers, one read-only dict per user agent, built once; assets
+    # also send a Referer to look more natural
+    PAGE_HEADERS = tuple({'User-Agent': ua} for ua in USER_AGENTS)
+    ASSET_HEADERS = tuple(
+        {'User-Agent': ua, 'Referer': 'https://web.archive.org/'} for ua in USER_AGENTS
+    )
+    
+    # Read size when streaming binary assets to disk
+    CHUNK_SIZE = 64 * 1024
+    
+    # Streamed chunks are written to disk in batches of about this many bytes
+    WRITE_BUFFER_SIZE = 1024 * 1024
+    
+    # Statuses retried after a pause, honoring Retry-After; backoff base and cap in seconds
+    RETRY_STATUSES = {429, 503}
+    RETRY_BASE_DELAY = 2.0
+    MAX_RETRY_DELAY = 30.0
+    
+    # Asset types that are always written as-is, whatever content type the archive reports
+    BINARY_TYPES = frozenset({'image', 'font', 'video', 'audio', 'document'})
+    
+    # Sidecar file holding ETag/Last-Modified of saved files
+    VALIDATORS_FILE = '.etags.json'
+    
+    # Text bodies larger than this are decoded in a worker thread
+    THREAD_DECODE_SIZE = 256 * 1024
+    
+    # Progress bar redraws happen every PROGRESS_BATCH files or PROGRESS_INTERVAL seconds
+    PROGRESS_BATCH = 50
+    PROGRESS_INTERVAL = 0.25
+    
+    def __init__(self, output_dir, max_concurrent=10, logger=None, proxy=None, rate_limit=1.0,
+                 revalidate=False, burst=1, limit_per_host=None, dns_cache_ttl=300):
         self.output_dir = Path(output_dir)
         self.max_concurrent = max_concurrent
+        self.limit_per_host = limit_per_host or min(max_concurrent, 6)
+        self.dns_cache_ttl = dns_cache_ttl
         self.logger = logger
         self.proxy = proxy
+        self.revalidate = revalidate
         self.wayback_api = WaybackAPI()
         self.session = None
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        
+        # Bounds requests in flight; request rate is paced separately by the rate limiter
+        self.semaphore = asyncio.BoundedSemaphore(max_concurrent)
+        
+        # Global request pacing shared by all concurrent downloads; the wide jitter
+        # keeps request spacing irregular to avoid bot detection
+        self.rate_limiter = RateLimiter(rate_limit, jitter=0.5, burst=burst)
         
         # Statistics
         self.downloaded = 0
         self.failed = 0
         self.skipped = 0
         
-        # Request tracking for delay management
-        self.last_request_time = 0
-        self.request_count = 0
+        # Files already in output_dir, indexed on enter so skip checks avoid a stat
+        self._existing_paths = set()
+        self._scanned = False
+        
+        # Wayback URL -> [ETag, Last-Modified] of the saved file, persisted between runs
+        self._validators = {}
+        
+        # (wayback URL, save, return_content) -> future of a download in progress
+        self._inflight = {}
+        
+        # Directories known to exist, so each is only created once per run
+        self._known_dirs = set()
+        
+        # Background writer batching whole-file saves, started on enter
+        self._writer = AsyncWriter(logger, self._known_dirs, lambda path: self._existing_paths.add(path))
+        
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -65,7 +319,7 @@ class AsyncDownloader:
             'User-Agent': user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': 'gzip, deflate',
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -76,11 +330,17 @@ class AsyncDownloader:
             'Cache-Control': 'max-age=0'
         }
         
-        # Configure connection pooling and SSL
+        # Configure connection pooling sized to our concurrency; nearly every request
+        # goes to web.archive.org, so kept-alive connections skip TCP+TLS handshakes.
+        # aiohttp already sets TCP_NODELAY on every connection it opens, so small
+        # requests are not held back by Nagle's algorithm. Sockets are capped at
+        # max_concurrent so idle extras are never opened only to be dropped by the
+        # server, and per host so one host is not flooded with parallel connections.
         connector = aiohttp.TCPConnector(
-            limit=100,  # Total connection pool limit
-            limit_per_host=30,  # Per-host connection limit
-            ttl_dns_cache=300,  # DNS cache timeout
+            limit=self.max_concurrent,  # Total connection pool limit
+            limit_per_host=self.limit_per_host,  # Per-host connection limit
+            ttl_dns_cache=self.dns_cache_ttl,  # DNS cache timeout
+            keepalive_timeout=30,  # Keep idle connections around between requests
             enable_cleanup_closed=True
         )
         
@@ -89,45 +349,42 @@ class AsyncDownloader:
             timeout=timeout,
             headers=headers,
             connector=connector,
-            cookie_jar=aiohttp.CookieJar()
+            cookie_jar=aiohttp.CookieJar(),
+            # Bodies are decompressed in worker threads instead of on the event loop
+            auto_decompress=False
         )
+        
+        # Index existing files once so resume checks are set lookups
+        await asyncio.to_thread(self.scan_existing_files)
+        
+        # Load validators of files saved by previous runs
+        self._validators = load_json_index(self.output_dir / self.VALIDATORS_FILE)
+        
+        self._writer.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        # Let queued saves land before the run is reported as done
+        await self._writer.close()
+        
         if self.session:
+            # Closing the session also closes the connector it owns
             await self.session.close()
-    
-    async def _apply_request_delay(self):
-        """Apply smart delay between requests to avoid bot detection"""
-        current_time = time.time()
-        self.request_count += 1
-        
-        # Base delay range (0.5 to 2 seconds)
-        min_delay = 0.5
-        max_delay = 2.0
         
-        # Every 10 requests, add a longer pause
-        if self.request_count % 10 == 0:
-            min_delay = 2.0
-            max_delay = 5.0
+        # Persist validators so the next run can revalidate cheaply
+        try:
+            save_json_index(self.output_dir / self.VALIDATORS_FILE, self._validators)
+        except OSError as e:
             if self.logger:
-                self.logger.debug(f"Applied longer pause after {self.request_count} requests")
-        
-        # Calculate time since last request
-        time_since_last = current_time - self.last_request_time
-        
-        # Generate random delay
-        target_delay = random.uniform(min_delay, max_delay)
-        
-        # Only sleep if we haven't waited long enough
-        if time_since_last < target_delay:
-            sleep_time = target_delay - time_since_last
-            await asyncio.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+                self.logger.debug(f"Failed to save {self.VALIDATORS_FILE}: {str(e)}")
+    
+    def _retry_delay(self, attempt):
+        """Exponential backoff with full jitter for the given retry attempt"""
+        return random.uniform(0, min(self.MAX_RETRY_DELAY, self.RETRY_BASE_DELAY * (2 ** attempt)))
     
-    async def download_file(self, wayback_url, original_url, is_main=False, save=True, force_download=False):
+    async def download_file(self, wayback_url, original_url, is_main=False, save=True, force_download=False,
+                            return_content=True, asset_type=None):
         """
         Download a single file
         
@@ -137,79 +394,146 @@ class AsyncDownloader:
             is_main: Whether this is the main HTML file
             save: Whether to save the file to disk
             force_download: Force download even if file exists
+            return_content: Whether the caller needs the content of an already saved file;
+                when False, existing files are skipped without being read back
+            asset_type: Type from the parser, if known; binary types are streamed to
+                disk even when served with a text content type
             
         Returns:
-            Tuple of (content, file_path) or (None, None) on failure
+            Tuple of (content, file_path) or (None, None) on failure.
+            Binary assets streamed to disk, and skipped files when return_content is
+            False, are returned as (None, file_path).
         """
+        # Concurrent callers for the same URL share one in-flight request
+        key = (wayback_url, save, return_content)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.skipped += 1
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._download_file(
+                wayback_url, original_url, is_main, save, force_download, return_content, asset_type
+            )
+            future.set_result(result)
+            return result
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+    
+    async def _download_file(self, wayback_url, original_url, is_main, save, force_download, return_content,
+                             asset_type):
+        """Download a single file; see download_file"""
         try:
             # Determine file path first to check if it exists
             file_path = None
+            conditional_headers = {}
             if save:
-                # We need to get the file path to check existence
-                # Create a temporary response object for path determination
-                file_path = self._determine_file_path(original_url, is_main, None)
+                # Resolve the destination once; the skip check and the save both use it
+                file_path = self._determine_file_path(original_url, is_main)
                 
                 # Check if file already exists and we don't want to force download
-                if not force_download and file_path.exists():
-                    self.skipped += 1
-                    if self.logger:
-                        self.logger.debug(f"File already exists, skipping download: {file_path}")
-                    
-                    # Read existing file content
-                    content = await self._read_existing_file(file_path)
-                    if content is not None:
-                        return content, file_path
+                if not force_download and self._file_exists(file_path):
+                    # With revalidation, ask the server when we have validators
+                    # to make the request conditional
+                    validators = self._validators.get(wayback_url) if self.revalidate else None
+                    if validators:
+                        etag, last_modified = validators
+                        if etag:
+                            conditional_headers['If-None-Match'] = etag
+                        if last_modified:
+                            conditional_headers['If-Modified-Since'] = last_modified
                     else:
+                        self.skipped += 1
                         if self.logger:
-                            self.logger.warning(f"Failed to read existing file: {file_path}")
-                        # Continue with download if reading fails
+                            self.logger.debug(f"File already exists, skipping download: {file_path}")
+                        
+                        if not return_content:
+                            return None, file_path
+                        
+                        # Read existing file content
+                        content = await self._read_existing_file(file_path)
+                        if content is not None:
+                            return content, file_path
+                        else:
+                            if self.logger:
+                                self.logger.warning(f"Failed to read existing file: {file_path}")
+                            # Continue with download if reading fails
             
             async with self.semaphore:
-                # Apply delay before request
-                await self._apply_request_delay()
-                
                 # Retry logic for rate limiting and network errors
                 max_retries = 5
-                base_delay = 2.0
                 
                 for attempt in range(max_retries + 1):
                     try:
                         # Rotate user agent for each retry
-                        headers = {'User-Agent': random.choice(self.USER_AGENTS)}
+                        headers = random.choice(self.PAGE_HEADERS if is_main else self.ASSET_HEADERS)
+                        if conditional_headers:
+                            headers = {**headers, **conditional_headers}
                         
-                        # Add referer header to look more natural
-                        if not is_main:
-                            headers['Referer'] = 'https://web.archive.org/'
+                        # Wait for a request slot
+                        await self.rate_limiter.acquire()
                         
                         async with self.session.get(wayback_url, proxy=self.proxy, headers=headers) as response:
-                            if response.status == 429:
-                                # Rate limited - wait and retry with exponential backoff
+                            if response.status in self.RETRY_STATUSES:
+                                # Rate limited or overloaded - slow everyone down and retry
+                                self.rate_limiter.slow_down()
                                 if attempt < max_retries:
-                                    # Exponential backoff with jitter
-                                    delay = base_delay * (2 ** attempt) + random.uniform(0, 3)
+                                    # Wait as long as the server asks, or back off exponentially
+                                    retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+                                    if retry_after:
+                                        delay = min(retry_after, self.MAX_RETRY_DELAY)
+                                    else:
+                                        delay = self._retry_delay(attempt)
                                     if self.logger:
-                                        self.logger.warning(f"Rate limited (429), retrying in {delay:.1f}s: {wayback_url}")
+                                        self.logger.warning(f"Rate limited ({response.status}), retrying in {delay:.1f}s: {wayback_url}")
                                     await asyncio.sleep(delay)
                                     continue
                                 else:
                                     if self.logger:
-                                        self.logger.warning(f"Failed to download after {max_retries} retries (429): {wayback_url}")
+                                        self.logger.warning(f"Failed to download after {max_retries} retries ({response.status}): {wayback_url}")
                                     self.failed += 1
                                     return None, None
                             
+                            if response.status == 304 and conditional_headers:
+                                # Saved copy is still current
+                                self.rate_limiter.recover()
+                                self.skipped += 1
+                                if self.logger:
+                                    self.logger.debug(f"Not modified, keeping: {file_path}")
+                                if not return_content:
+                                    return None, file_path
+                                return await self._read_existing_file(file_path), file_path
+                            
                             if response.status != 200:
                                 if self.logger:
                                     self.logger.warning(f"Failed to download {wayback_url}: {response.status}")
                                 self.failed += 1
                                 return None, None
                             
-                            # Success - break out of retry loop
-                            break
+                            self.rate_limiter.recover()
+                            
+                            # Remember validators so a later run can revalidate cheaply
+                            if save:
+                                etag = response.headers.get('ETag')
+                                last_modified = response.headers.get('Last-Modified')
+                                if etag or last_modified:
+                                    self._validators[wayback_url] = [etag, last_modified]
+                            
+                            # Consume and save the body while the connection is held, so it
+                            # goes straight back to the pool
+                            return await self._handle_response(
+                                response, is_main, save, file_path, asset_type
+                            )
                     
                     except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                         if attempt < max_retries:
                             # Exponential backoff with jitter
-                            delay = base_delay * (2 ** attempt) + random.uniform(0, 3)
+                            delay = self._retry_delay(attempt)
                             if self.logger:
                                 # Check if it's a proxy-related error
                                 error_msg = str(e).lower()
@@ -230,60 +554,119 @@ class AsyncDownloader:
                             self.failed += 1
                             return None, None
                     
-                content = await response.read()
-                
-                # Decode text content
-                if response.content_type and 'text' in response.content_type:
-                    try:
-                        content = content.decode('utf-8')
-                    except UnicodeDecodeError:
-                        # Try with latin-1 as fallback
-                        try:
-                            content = content.decode('latin-1')
-                        except:
-                            # Keep as bytes if decoding fails
-                            pass
-                
-                if not save:
-                    return content, None
-                
-                # Determine file path if not already set
-                if file_path is None:
-                    file_path = self._determine_file_path(original_url, is_main, response)
-                
-                # Create directory
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Save file
-                if isinstance(content, str):
-                    async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                        await f.write(content)
-                else:
-                    async with aiofiles.open(file_path, 'wb') as f:
-                        await f.write(content)
-                
-                self.downloaded += 1
-                if self.logger:
-                    self.logger.debug(f"Downloaded: {file_path}")
-                
-                return content, file_path
-                    
         except Exception as e:
             if self.logger:
                 self.logger.warning(f"Unexpected error downloading {wayback_url}: {str(e)}")
             self.failed += 1
             return None, None
     
+    async def _handle_response(self, response, is_main, save, file_path, asset_type=None):
+        """
+        Read, decode and save a successful response
+        
+        Args:
+            response: aiohttp response object with status 200
+            is_main: Whether this is the main HTML file
+            save: Whether to save the file to disk
+            file_path: Destination path when saving
+            asset_type: Type from the parser, if known
+            
+        Returns:
+            Tuple of (content, file_path) as returned by download_file
+        """
+        # Stream binary assets straight to disk; pages and text stay in memory.
+        # Without a binary asset type, only stream bodies that are clearly not
+        # markup, so pages served as XHTML or without a content type still parse
+        content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
+        is_text = 'text' in content_type
+        is_markup = is_text or 'html' in content_type or 'xml' in content_type
+        is_binary = asset_type in self.BINARY_TYPES or (bool(content_type) and not is_markup)
+        if save and not is_main and is_binary:
+            await self._stream_to_file(response, file_path)
+            self._existing_paths.add(file_path)
+            self.downloaded += 1
+            if self.logger:
+                self.logger.debug(f"Downloaded: {file_path}")
+            return None, file_path
+        
+        content = await response.read()
+        decompressor = _decompressor(response)
+        if decompressor:
+            content = await asyncio.to_thread(_inflate, decompressor, content)
+        
+        # Decode text content with the charset declared in the header or the markup,
+        # off the event loop for large bodies; binary asset types stay as bytes
+        if is_text and asset_type not in self.BINARY_TYPES:
+            encoding = response.charset or _sniff_meta_charset(content) or 'utf-8'
+            if len(content) > self.THREAD_DECODE_SIZE:
+                content = await asyncio.to_thread(_decode_text, content, encoding)
+            else:
+                content = _decode_text(content, encoding)
+        
+        if not save:
+            return content, None
+        
+        # Hand off to the background writer, which batches small files together
+        await self._writer.write(file_path, content)
+        
+        self.downloaded += 1
+        if self.logger:
+            self.logger.debug(f"Downloaded: {file_path}")
+        
+        return content, file_path
+    
+    async def _stream_to_file(self, response, file_path):
+        """
+        Write a response body to disk chunk by chunk
+        
+        Args:
+            response: aiohttp response object
+            file_path: Destination path
+        """
+        self._ensure_dir(file_path.parent)
+        decompressor = _decompressor(response)
+        f = await asyncio.to_thread(open, file_path, 'wb', buffering=0)
+        try:
+            # Collect chunks and hand them to a worker thread about once per MiB
+            pending, pending_size = [], 0
+            async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= self.WRITE_BUFFER_SIZE:
+                    await asyncio.to_thread(_write_chunks, f, pending, decompressor)
+                    pending, pending_size = [], 0
+            if decompressor:
+                await asyncio.to_thread(_write_chunks, f, pending, decompressor, True)
+            elif pending:
+                await asyncio.to_thread(_write_chunks, f, pending)
+        except BaseException:
+            # Don't leave a truncated file behind to be skipped on resume
+            f.close()
+            file_path.unlink(missing_ok=True)
+            raise
+        f.close()
+    
     async def download_assets(self, assets, sequential=False):
         """
         Download multiple assets concurrently or sequentially
         
         Args:
-            assets: List of asset dictionaries
+            assets: List of Asset tuples
             sequential: If True, download assets one by one
         """
-        # Filter out None assets
-        valid_assets = [a for a in assets if a is not None]
+        # Filter out None assets and repeated URLs
+        seen = set()
+        valid_assets = [
+            a for a in assets
+            if a is not None and a.wayback_url not in seen and not seen.add(a.wayback_url)
+        ]
+        
+        # Create every parent directory up front in one worker-thread hop
+        parents = {
+            self._determine_file_path(a.original_url, False).parent for a in valid_assets
+        } - self._known_dirs
+        if parents:
+            await asyncio.to_thread(self._create_dirs, parents)
         
         # Create progress bar
         progress_bar = tqdm(
@@ -291,29 +674,36 @@ class AsyncDownloader:
             desc="Downloading assets",
             unit="files"
         )
+        # Per-call counter, so concurrent download_assets calls keep separate tallies
+        progress = _BatchedProgress(progress_bar, self.PROGRESS_BATCH, self.PROGRESS_INTERVAL)
         
         if sequential:
             # Download assets sequentially
             for asset in valid_assets:
                 await self._download_asset_with_progress(
-                    asset['wayback_url'],
-                    asset['original_url'],
-                    progress_bar
+                    asset.wayback_url,
+                    asset.original_url,
+                    progress,
+                    asset.type
                 )
         else:
-            # Create download tasks for concurrent execution
-            tasks = []
-            for asset in valid_assets:
-                task = self._download_asset_with_progress(
-                    asset['wayback_url'],
-                    asset['original_url'],
-                    progress_bar
-                )
-                tasks.append(task)
+            # A fixed pool of workers pulls from one shared iterator, so only
+            # max_concurrent coroutines exist however long the asset list is
+            remaining = iter(valid_assets)
+            
+            async def _worker():
+                for asset in remaining:
+                    await self._download_asset_with_progress(
+                        asset.wayback_url,
+                        asset.original_url,
+                        progress,
+                        asset.type
+                    )
             
-            # Execute downloads concurrently
-            await asyncio.gather(*tasks, return_exceptions=True)
+            workers = min(self.max_concurrent, len(valid_assets))
+            await asyncio.gather(*(_worker() for _ in range(workers)))
         
+        progress.flush()
         progress_bar.close()
         
         # Log statistics
@@ -323,71 +713,53 @@ class AsyncDownloader:
             self.logger.info(f"  Failed: {self.failed}")
             self.logger.info(f"  Skipped: {self.skipped}")
     
-    async def _download_asset_with_progress(self, wayback_url, original_url, progress_bar):
+    async def _download_asset_with_progress(self, wayback_url, original_url, progress, asset_type=None):
         """Download asset and update progress bar"""
         try:
-            await self.download_file(wayback_url, original_url)
+            await self.download_file(wayback_url, original_url, return_content=False, asset_type=asset_type)
             # Delay is now handled inside download_file method
         except Exception as e:
             if self.logger:
                 self.logger.debug(f"Failed to download {wayback_url}: {str(e)}")
         finally:
-            progress_bar.update(1)
+            # Redraw in batches rather than once per file
+            progress.tick()
     
-    def _determine_file_path(self, url, is_main, response=None):
+    def _file_exists(self, file_path):
+        """Check the scanned index, or the filesystem if the output dir was never scanned"""
+        if file_path in self._existing_paths:
+            return True
+        return not self._scanned and file_path.exists()
+    
+    def _ensure_dir(self, directory):
+        """Create directory unless this run already created it"""
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+    
+    def _create_dirs(self, directories):
+        """Create a batch of directories (run in a worker thread)"""
+        for directory in directories:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._known_dirs.add(directory)
+            except OSError as e:
+                if self.logger:
+                    self.logger.debug(f"Failed to create directory {directory}: {str(e)}")
+    
+    def _determine_file_path(self, url, is_main):
         """
         Determine local file path for URL
         
         Args:
             url: Original URL
             is_main: Whether this is the main file
-            response: aiohttp response object (optional)
             
         Returns:
             Path object for local file
         """
-        # Parse URL
-        parsed = urlparse(url)
-        
-        # Get path components
-        path = unquote(parsed.path)
-        if not path or path == '/':
-            path = '/index.html'
-        elif path.endswith('/'):
-            path += 'index.html'
-        
-        # Remove leading slash
-        if path.startswith('/'):
-            path = path[1:]
-        
-        # Handle query parameters in filename
-        if parsed.query:
-            # Replace special characters
-            query_safe = parsed.query.replace('&', '_').replace('=', '_')
-            base, ext = Path(path).stem, Path(path).suffix
-            path = f"{base}_{query_safe}{ext}"
-        
-        # Ensure file has extension
-        file_path = Path(path)
-        if not file_path.suffix:
-            # Try to determine from content-type if response is available
-            if response:
-                content_type = response.headers.get('content-type', '').split(';')[0]
-                ext = mimetypes.guess_extension(content_type)
-                if ext:
-                    path += ext
-                else:
-                    # Default to .html for text content
-                    if 'text' in content_type:
-                        path += '.html'
-            else:
-                # Default to .html if no response object
-                path += '.html'
-        
         # Construct full path
-        full_path = self.output_dir / path
-        
-        return full_path
+        return self.output_dir / _compute_rel_path(url, is_main)
     
     async def _read_existing_file(self, file_path):
         """
@@ -400,22 +772,7 @@ class AsyncDownloader:
             File content as string or bytes, or None if failed
         """
         try:
-            # Try to read as text first (for HTML files)
-            try:
-                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    return content
-            except UnicodeDecodeError:
-                # Try with latin-1 as fallback
-                try:
-                    async with aiofiles.open(file_path, 'r', encoding='latin-1') as f:
-                        content = await f.read()
-                        return content
-                except:
-                    # Read as binary if text reading fails
-                    async with aiofiles.open(file_path, 'rb') as f:
-                        content = await f.read()
-                        return content
+            return await asyncio.to_thread(_sync_read, file_path)
         except Exception as e:
             if self.logger:
                 self.logger.debug(f"Failed to read existing file {file_path}: {str(e)}")
@@ -423,41 +780,16 @@ class AsyncDownloader:
     
     def scan_existing_files(self):
         """
-        Scan the output directory for existing files and return their URLs
+        Index the files already in the output directory
         
         Returns:
-            Set of URLs that have already been downloaded based on existing files
+            Set of Paths of existing files, also kept for skip checks in download_file
         """
-        existing_urls = set()
+        existing_paths = set(map(Path, scan_files(self.output_dir, self.logger)))
         
-        if not self.output_dir.exists():
-            return existing_urls
-        
-        # Find all HTML files in the output directory
-        for html_file in self.output_dir.rglob('*.html'):
-            try:
-                # Convert file path back to URL
-                relative_path = html_file.relative_to(self.output_dir)
-                
-                # Skip if it's an index file in root (main page)
-                if relative_path.name == 'index.html' and len(relative_path.parts) == 1:
-                    continue
-                
-                # Reconstruct the URL from the file path
-                url_path = str(relative_path)
-                if url_path.endswith('/index.html'):
-                    url_path = url_path[:-11]  # Remove /index.html
-                elif url_path.endswith('.html'):
-                    url_path = url_path[:-5]   # Remove .html
-                
-                # This is a simplified reconstruction - in practice, we'd need
-                # to be more sophisticated about converting file paths back to URLs
-                # For now, we'll just mark that we have HTML files
-                if self.logger:
-                    self.logger.debug(f"Found existing HTML file: {html_file}")
-                    
-            except Exception as e:
-                if self.logger:
-                    self.logger.debug(f"Error processing existing file {html_file}: {str(e)}")
+        if self.logger:
+            self.logger.debug(f"Found {len(existing_paths)} existing files in {self.output_dir}")
         
-        return existing_urls
\ No newline at end of file
+        self._existing_paths = existing_paths
+        self._scanned = True
+        return existing_paths
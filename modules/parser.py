@@ -2,19 +2,87 @@
 HTML and CSS parser for extracting assets
 """
 
+import asyncio
+import html
 import re
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from .wayback_api import WaybackAPI
 
+# Prefer the C-based lxml parser, falling back to the pure-Python one
+try:
+    import lxml  # noqa: F401
+    _PARSER = 'lxml'
+except ImportError:
+    _PARSER = 'html.parser'
+
+# Only tags that can reference assets or links are built into the tree
+# (picture is kept so its <source> children can be told apart from media sources)
+_STRAINER = SoupStrainer(['link', 'script', 'img', 'picture', 'video', 'source', 'audio', 'meta', 'a'])
+
+# Inline style attributes, read from the raw markup instead of the tree. Comments and
+# script bodies are matched first so nothing inside them is taken for an attribute, and
+# the attribute name must stand alone (not data-style or similar)
+_STYLE_ATTR_RE = re.compile(
+    r'''<!--.*?-->|<script\b[^>]*>.*?</script\s*>|(?<![\w-])style\s*=\s*(?:"([^"]*)"|'([^']*)')''',
+    re.IGNORECASE | re.DOTALL
+)
+_STYLE_ATTR_BYTES_RE = re.compile(_STYLE_ATTR_RE.pattern.encode(), re.IGNORECASE | re.DOTALL)
+
+# srcset candidates: the URL is a run of non-whitespace (it may contain commas) and
+# ends at whitespace or trailing commas; any descriptor runs up to the next comma
+_SRCSET_RE = re.compile(r'\s*(\S+?)(?:,+(?=\s|$)|\s+[^,]*(?:,|$)|$)')
+
+
+@lru_cache(maxsize=4096)
+def _urljoin(base, url):
+    """urljoin, cached since pages in one site repeat the same relative URLs"""
+    return urljoin(base, url)
+
+
+class Asset(NamedTuple):
+    """An asset or link found in a page, with its Wayback and original URLs"""
+    wayback_url: str
+    original_url: str
+    type: str
+
 
 class AssetParser:
     """Parse HTML and CSS to extract asset URLs"""
     
-    def __init__(self):
+    def __init__(self, max_workers=4):
+        """
+        Args:
+            max_workers: Threads used to parse pages off the event loop
+        """
         self.wayback_api = WaybackAPI()
         
+        # Parsing is CPU-bound; run it here so downloads keep flowing meanwhile
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='parser')
+        
+        # Most recent (html_content, soup), shared by parse() and asset and link extraction
+        self._last_parse = None
+        
+        # id(soup) -> markup it was parsed from, so inline styles can still be read
+        # from the raw text when several pages' documents are in use at once
+        self._markup = {}
+        
+        # Tag name -> method yielding (url, asset type) pairs for that tag
+        self._tag_handlers = {
+            'link': self._link_urls,
+            'script': self._script_urls,
+            'img': self._img_urls,
+            'video': self._media_urls,
+            'audio': self._media_urls,
+            'source': self._source_urls,
+            'meta': self._meta_urls,
+        }
+        
         # Asset patterns in CSS
         self.css_url_pattern = re.compile(
             r'url\s*\(\s*["\']?([^"\'()]+)["\']?\s*\)',
@@ -31,8 +99,88 @@ class AssetParser:
             'audio': ['.mp3', '.wav', '.ogg', '.m4a'],
             'document': ['.pdf', '.doc', '.docx', '.xls', '.xlsx']
         }
+        
+        # Flattened extension -> type lookup; the first type listing an extension wins
+        self._ext_to_type = {}
+        for asset_type, extensions in self.asset_extensions.items():
+            for ext in extensions:
+                self._ext_to_type.setdefault(ext, asset_type)
+    
+    async def parse(self, html_content):
+        """
+        Parse a page once so its assets and links can both be extracted from the result
+        
+        Args:
+            html_content: HTML string
+            
+        Returns:
+            BeautifulSoup document, accepted by extract_assets and extract_links
+        """
+        return await self._run(self._parse, html_content)
+    
+    async def extract_assets(self, html_content, base_url):
+        """
+        Extract all asset URLs from HTML content without blocking the event loop
+        
+        Args:
+            html_content: HTML string, or a document returned by parse()
+            base_url: Base URL for resolving relative URLs
+            
+        Returns:
+            List of unique Asset tuples with URLs and types
+        """
+        return await self._run(self._extract_assets_sync, html_content, base_url)
+    
+    async def extract_links(self, html_content, base_url):
+        """
+        Extract all hyperlinks from HTML content without blocking the event loop
+        
+        Args:
+            html_content: HTML string, or a document returned by parse()
+            base_url: Base URL for resolving relative URLs
+            
+        Returns:
+            List of Asset tuples with URLs
+        """
+        return await self._run(self._extract_links_sync, html_content, base_url)
     
-    def extract_assets(self, html_content, base_url):
+    async def filter_links(self, html_content, base_url, keep):
+        """
+        Extract hyperlinks and keep the wanted ones in a single pass, without
+        blocking the event loop or building the full list of links
+        
+        Args:
+            html_content: HTML string, or a document returned by parse()
+            base_url: Base URL for resolving relative URLs
+            keep: Called on the parser's threads with each link, returns whether to keep it
+            
+        Returns:
+            Tuple of (number of links found, list of kept Asset tuples)
+        """
+        return await self._run(self._filter_links_sync, html_content, base_url, keep)
+    
+    async def extract_css_assets(self, css_content, base_url):
+        """
+        Extract asset URLs from CSS content without blocking the event loop
+        
+        Args:
+            css_content: CSS string
+            base_url: Base URL for resolving relative URLs
+            
+        Returns:
+            List of Asset tuples
+        """
+        return await self._run(self._extract_urls_from_css, css_content, base_url)
+    
+    def close(self):
+        """Shut down the parsing threads"""
+        self._executor.shutdown(wait=False)
+    
+    async def _run(self, func, *args):
+        """Run a synchronous parsing method on the parser's thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    def _extract_assets_sync(self, html_content, base_url):
         """
         Extract all asset URLs from HTML content
         
@@ -41,71 +189,39 @@ class AssetParser:
             base_url: Base URL for resolving relative URLs
             
         Returns:
-            List of asset dictionaries with URLs and types
+            List of unique Asset tuples with URLs and types
         """
         assets = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._parse(html_content)
+        markup = self._markup_of(html_content, soup)
         
-        # Extract stylesheets
-        for link in soup.find_all('link', rel='stylesheet'):
-            href = link.get('href')
-            if href:
-                assets.append(self._create_asset_dict(href, base_url, 'css'))
-        
-        # Extract scripts
-        for script in soup.find_all('script', src=True):
-            src = script.get('src')
-            if src:
-                assets.append(self._create_asset_dict(src, base_url, 'js'))
-        
-        # Extract images
-        for img in soup.find_all('img'):
-            src = img.get('src')
-            if src:
-                assets.append(self._create_asset_dict(src, base_url, 'image'))
-            # Also get srcset
-            srcset = img.get('srcset')
-            if srcset:
-                for src_item in srcset.split(','):
-                    src_url = src_item.strip().split(' ')[0]
-                    if src_url:
-                        assets.append(self._create_asset_dict(src_url, base_url, 'image'))
-        
-        # Extract favicons and other link resources
-        for link in soup.find_all('link'):
-            if link.get('rel') and 'icon' in str(link.get('rel')):
-                href = link.get('href')
-                if href:
-                    assets.append(self._create_asset_dict(href, base_url, 'image'))
-        
-        # Extract video sources
-        for video in soup.find_all(['video', 'source']):
-            src = video.get('src')
-            if src:
-                assets.append(self._create_asset_dict(src, base_url, 'video'))
-        
-        # Extract audio sources
-        for audio in soup.find_all(['audio', 'source']):
-            src = audio.get('src')
-            if src:
-                assets.append(self._create_asset_dict(src, base_url, 'audio'))
-        
-        # Extract inline style URLs
-        for element in soup.find_all(style=True):
-            style = element.get('style', '')
-            css_assets = self._extract_urls_from_css(style, base_url)
-            assets.extend(css_assets)
-        
-        # Extract meta property images (Open Graph, Twitter Cards)
-        for meta in soup.find_all('meta'):
-            if meta.get('property') in ['og:image', 'twitter:image']:
-                content = meta.get('content')
-                if content:
-                    assets.append(self._create_asset_dict(content, base_url, 'image'))
+        # Relative URLs resolve against the page's original URL, computed once per page
+        original_base = self.wayback_api.extract_original_url(base_url)
+        
+        # Keep only the first occurrence of each Wayback URL
+        seen = set()
+        
+        def _add(asset):
+            if asset and asset.wayback_url not in seen:
+                seen.add(asset.wayback_url)
+                assets.append(asset)
+        
+        # Single walk over the parsed tags, dispatching on tag name
+        for tag in soup.find_all(True):
+            handler = self._tag_handlers.get(tag.name)
+            if handler:
+                for url, asset_type in handler(tag):
+                    if not url.startswith('data:'):
+                        _add(self._create_asset(url, base_url, asset_type, original_base))
+        
+        # Extract inline style URLs straight from the markup
+        for style in self._inline_styles(markup, soup):
+            for asset in self._extract_urls_from_css(style, base_url, original_base):
+                _add(asset)
         
         return assets
     
-    def extract_links(self, html_content, base_url):
+    def _extract_links_sync(self, html_content, base_url):
         """
         Extract all hyperlinks from HTML content
         
@@ -114,10 +230,34 @@ class AssetParser:
             base_url: Base URL for resolving relative URLs
             
         Returns:
-            List of link dictionaries with URLs
+            List of Asset tuples with URLs
+        """
+        return list(self._iter_links(html_content, base_url))
+    
+    def _filter_links_sync(self, html_content, base_url, keep):
+        """Count the page's links and collect those keep() accepts"""
+        found = 0
+        kept = []
+        for link in self._iter_links(html_content, base_url):
+            found += 1
+            if keep(link):
+                kept.append(link)
+        return found, kept
+    
+    def _iter_links(self, html_content, base_url):
+        """
+        Yield each distinct hyperlink of HTML content as it is found
+        
+        Args:
+            html_content: HTML string, or an already parsed document
+            base_url: Base URL for resolving relative URLs
+            
+        Yields:
+            Asset tuples with URLs, in document order
         """
-        links = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._parse(html_content)
+        original_base = self.wayback_api.extract_original_url(base_url)
+        seen_urls = set()
         
         # Extract all anchor tags with href
         for anchor in soup.find_all('a', href=True):
@@ -127,31 +267,130 @@ class AssetParser:
                 if href.startswith(('#', 'javascript:', 'mailto:', 'tel:', 'ftp:', 'data:')):
                     continue
                 
-                # Create link dict similar to assets
-                link_dict = self._create_link_dict(href, base_url)
-                if link_dict:
-                    links.append(link_dict)
+                # Create link similar to assets, skipping duplicates as they come
+                link = self._create_link(href, base_url, original_base)
+                if link and link.wayback_url not in seen_urls:
+                    seen_urls.add(link.wayback_url)
+                    yield link
+    
+    def _parse(self, html_content):
+        """
+        Parse HTML once per page, keeping only tags that can reference assets or links
         
-        # Remove duplicates
-        unique_links = []
-        seen_urls = set()
-        for link in links:
-            if link['wayback_url'] not in seen_urls:
-                seen_urls.add(link['wayback_url'])
-                unique_links.append(link)
+        Asset and link extraction are called on the same content in turn,
+        so the last parse is reused when the same object is passed again.
         
-        return unique_links
+        Args:
+            html_content: HTML string, or an already parsed document
+            
+        Returns:
+            BeautifulSoup document
+        """
+        if isinstance(html_content, BeautifulSoup):
+            return html_content
+        if self._last_parse is not None and self._last_parse[0] is html_content:
+            return self._last_parse[1]
+        
+        soup = BeautifulSoup(html_content, _PARSER, parse_only=_STRAINER)
+        self._last_parse = (html_content, soup)
+        self._markup[id(soup)] = html_content
+        # Drop the entry with the document, before its id can be reused
+        weakref.finalize(soup, self._markup.pop, id(soup), None)
+        return soup
+    
+    def _markup_of(self, html_content, soup):
+        """Raw markup behind soup, or None when a document parsed elsewhere was passed"""
+        if not isinstance(html_content, BeautifulSoup):
+            return html_content
+        return self._markup.get(id(soup))
+    
+    def _inline_styles(self, html_content, soup=None):
+        """Yield the value of every style attribute in the raw markup"""
+        # Without the markup, only the tags kept in the document can be searched
+        if html_content is None:
+            for tag in soup.find_all(style=True):
+                style = tag['style']
+                if 'url' in style.lower():
+                    yield style
+            return
+        
+        # Scan bytes as-is and decode only the matched attribute values
+        is_bytes = isinstance(html_content, bytes)
+        pattern = _STYLE_ATTR_BYTES_RE if is_bytes else _STYLE_ATTR_RE
+        
+        for double_quoted, single_quoted in pattern.findall(html_content):
+            # Skipped comments and scripts match with both groups empty
+            style = double_quoted or single_quoted
+            if is_bytes:
+                style = style.decode('utf-8', errors='replace')
+            if 'url' in style.lower():
+                yield html.unescape(style) if '&' in style else style
+    
+    def _link_urls(self, tag):
+        """Stylesheets, favicons and other icon links"""
+        href = tag.get('href')
+        if not href:
+            return
+        rel = tag.get('rel')
+        if rel and 'stylesheet' in rel:
+            yield href, 'css'
+        if rel and 'icon' in str(rel):
+            yield href, 'image'
+    
+    def _script_urls(self, tag):
+        """External scripts"""
+        src = tag.get('src')
+        if src:
+            yield src, 'js'
+    
+    def _img_urls(self, tag):
+        """Image src and every srcset candidate"""
+        src = tag.get('src')
+        if src:
+            yield src, 'image'
+        yield from self._srcset_urls(tag)
+    
+    def _media_urls(self, tag):
+        """Video and audio sources"""
+        src = tag.get('src')
+        if src:
+            yield src, 'audio' if tag.name == 'audio' else 'video'
     
-    def _create_link_dict(self, url, base_url):
+    def _source_urls(self, tag):
+        """<source> children of video, audio and picture elements, typed by parent"""
+        parent = tag.parent.name if tag.parent is not None else None
+        if parent == 'picture':
+            yield from self._srcset_urls(tag)
+            return
+        src = tag.get('src')
+        if src:
+            yield src, 'audio' if parent == 'audio' else 'video'
+    
+    def _srcset_urls(self, tag):
+        """Every candidate URL in a srcset attribute"""
+        srcset = tag.get('srcset')
+        if srcset:
+            for src_url in _SRCSET_RE.findall(srcset):
+                yield src_url, 'image'
+    
+    def _meta_urls(self, tag):
+        """Open Graph and Twitter Card images"""
+        if tag.get('property') in ('og:image', 'twitter:image'):
+            content = tag.get('content')
+            if content:
+                yield content, 'image'
+    
+    def _create_link(self, url, base_url, original_base=None):
         """
-        Create link dictionary with normalized URLs
+        Create link with normalized URLs
         
         Args:
             url: Link URL (relative or absolute)
             base_url: Base URL for resolution
+            original_base: Original URL of base_url, if already known
             
         Returns:
-            Link dictionary or None if invalid
+            Asset of type 'link', or None if invalid
         """
         # Clean the URL
         url = url.strip()
@@ -160,57 +399,21 @@ class AssetParser:
         if not url:
             return None
         
-        # Handle Wayback-specific URL modifications
-        if url.startswith('/web/') and 'http' in url:
-            # This is likely a Wayback URL
-            wayback_base = self.wayback_api.BASE_URL
-            url = wayback_base + url
-        
-        # Resolve relative URLs
-        if not url.startswith(('http://', 'https://', '//')):
-            # For Wayback URLs, we need to resolve against the original URL
-            original_base = self.wayback_api.extract_original_url(base_url)
-            resolved_url = urljoin(original_base, url)
-        else:
-            resolved_url = url
-        
-        # Handle protocol-relative URLs
-        if resolved_url.startswith('//'):
-            resolved_url = 'https:' + resolved_url
+        wayback_url, resolved_url = self._resolve(url, base_url, original_base)
         
-        # Convert to Wayback URL if needed
-        wayback_url = self.wayback_api.convert_to_wayback_url(resolved_url, base_url)
-        wayback_url = self.wayback_api.clean_wayback_url(wayback_url)
-        
-        return {
-            'original_url': resolved_url,
-            'wayback_url': wayback_url,
-            'type': 'link'
-        }
+        return Asset(wayback_url, resolved_url, 'link')
     
-    def extract_css_assets(self, css_content, base_url):
-        """
-        Extract asset URLs from CSS content
-        
-        Args:
-            css_content: CSS string
-            base_url: Base URL for resolving relative URLs
-            
-        Returns:
-            List of asset dictionaries
-        """
-        return self._extract_urls_from_css(css_content, base_url)
-    
-    def _extract_urls_from_css(self, css_content, base_url):
+    def _extract_urls_from_css(self, css_content, base_url, original_base=None):
         """
         Extract URLs from CSS content using regex
         
         Args:
             css_content: CSS string
             base_url: Base URL for resolving relative URLs
+            original_base: Original URL of base_url, if already known
             
         Returns:
-            List of asset dictionaries
+            List of Asset tuples
         """
         assets = []
         
@@ -224,21 +427,22 @@ class AssetParser:
             
             # Determine asset type
             asset_type = self._determine_asset_type(url)
-            assets.append(self._create_asset_dict(url, base_url, asset_type))
+            assets.append(self._create_asset(url, base_url, asset_type, original_base))
         
         return assets
     
-    def _create_asset_dict(self, url, base_url, asset_type):
+    def _create_asset(self, url, base_url, asset_type, original_base=None):
         """
-        Create asset dictionary with normalized URLs
+        Create asset with normalized URLs
         
         Args:
             url: Asset URL (relative or absolute)
             base_url: Base URL for resolution
             asset_type: Type of asset
+            original_base: Original URL of base_url, if already known
             
         Returns:
-            Asset dictionary
+            Asset, or None if invalid
         """
         # Clean the URL
         url = url.strip()
@@ -247,33 +451,44 @@ class AssetParser:
         if url.startswith('data:'):
             return None
         
-        # Handle Wayback-specific URL modifications
-        if url.startswith('/web/') and 'http' in url:
+        wayback_url, resolved_url = self._resolve(url, base_url, original_base)
+        
+        return Asset(wayback_url, resolved_url, asset_type)
+    
+    def _resolve(self, url, base_url, original_base=None):
+        """
+        Resolve an asset or link URL against the page
+        
+        Args:
+            url: Stripped URL as found in the page
+            base_url: Wayback URL of the page
+            original_base: Original URL of base_url, if already known
+            
+        Returns:
+            Tuple of (wayback_url, resolved_url)
+        """
+        # Most URLs in real pages are already absolute; resolve those with no parsing
+        if url.startswith(('http://', 'https://')):
+            resolved_url = url
+        elif url.startswith('/web/') and 'http' in url:
             # This is likely a Wayback URL
-            wayback_base = self.wayback_api.BASE_URL
-            url = wayback_base + url
-        
-        # Resolve relative URLs
-        if not url.startswith(('http://', 'https://', '//')):
-            # For Wayback URLs, we need to resolve against the original URL
-            original_base = self.wayback_api.extract_original_url(base_url)
-            resolved_url = urljoin(original_base, url)
+            resolved_url = self.wayback_api.BASE_URL + url
+        elif url.startswith('//'):
+            # Protocol-relative URL
+            resolved_url = 'https:' + url
         else:
-            resolved_url = url
-        
-        # Handle protocol-relative URLs
-        if resolved_url.startswith('//'):
-            resolved_url = 'https:' + resolved_url
+            # Relative URLs resolve against the page's original URL
+            if original_base is None:
+                original_base = self.wayback_api.extract_original_url(base_url)
+            resolved_url = _urljoin(original_base, url)
+            if resolved_url.startswith('//'):
+                resolved_url = 'https:' + resolved_url
         
         # Convert to Wayback URL if needed
         wayback_url = self.wayback_api.convert_to_wayback_url(resolved_url, base_url)
         wayback_url = self.wayback_api.clean_wayback_url(wayback_url)
         
-        return {
-            'original_url': resolved_url,
-            'wayback_url': wayback_url,
-            'type': asset_type
-        }
+        return wayback_url, resolved_url
     
     def _determine_asset_type(self, url):
         """
@@ -285,12 +500,11 @@ class AssetParser:
         Returns:
             Asset type string
         """
-        url_lower = url.lower()
-        
-        for asset_type, extensions in self.asset_extensions.items():
-            for ext in extensions:
-                if ext in url_lower:
-                    return asset_type
-        
-        # Default to 'other'
-        return 'other'
\ No newline at end of file
+        # Extension of the last path segment, ignoring query and fragment
+        path = url.split('?', 1)[0].split('#', 1)[0]
+        name = path[path.rfind('/') + 1:]
+        dot = name.rfind('.')
+        if dot == -1:
+            return 'other'
+        
+        return self._ext_to_type.get(name[dot:].lower(), 'other')
@@ -0,0 +1,70 @@
+"""
+Async rate limiter shared by concurrent download coroutines
+"""
+
+import asyncio
+import random
+import time
+
+
+class RateLimiter:
+    """Token bucket pacing requests across all coroutines sharing the limiter
+
+    Tokens refill at ``rate`` per second up to ``burst``, so after an idle
+    spell up to ``burst`` requests go out back to back before pacing resumes.
+    """
+
+    def __init__(self, rate, jitter=0.0, burst=1):
+        """
+        Args:
+            rate: Maximum sustained requests per second
+            jitter: Relative random variation applied to each interval (0.1 = ±10%)
+            burst: Bucket capacity, the number of requests allowed back to back
+        """
+        self.rate = rate
+        self.jitter = jitter
+        self.burst = max(1, int(burst))
+
+        # Time at which the bucket would be empty again (the theoretical
+        # arrival time of the next request when no tokens are saved up)
+        self._next_slot = 0.0
+        self._lock = None
+
+        # Multiplier on the request interval, raised when the server pushes back
+        self.penalty = 1.0
+
+    async def acquire(self):
+        """Wait until the next request slot is available"""
+        # Created lazily so the lock binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            now = time.monotonic()
+            interval = self.penalty / self.rate
+            if self.jitter:
+                interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+
+            # Take a token: reserve the next slot, letting it run up to
+            # burst - 1 intervals early while saved-up tokens last
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + interval
+
+        delay = slot - (self.burst - 1) * interval - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def slow_down(self, factor=2.0, max_penalty=32.0):
+        """Lower the effective rate after a rate-limit response"""
+        self.penalty = min(self.penalty * factor, max_penalty)
+
+    def recover(self, factor=0.9):
+        """Let the effective rate drift back up after a successful request"""
+        self.penalty = max(1.0, self.penalty * factor)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
@@ -0,0 +1,154 @@
+"""
+Optional io_uring file writer for high-throughput crawls on Linux
+"""
+
+import asyncio
+import os
+import queue
+import sys
+import threading
+from typing import NamedTuple
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+
+class UringOp(NamedTuple):
+    """A single queued write and the future resolved when it completes"""
+    path: str
+    data: bytes
+    future: asyncio.Future
+
+
+class UringWriter:
+    """Batch file writes through one io_uring owned by a background thread"""
+
+    BATCH_SIZE = 64
+
+    def __init__(self, logger=None):
+        """
+        Args:
+            logger: Logger instance
+        """
+        self.logger = logger
+        self._loop = None
+        self._ops = queue.SimpleQueue()
+        self._thread = None
+
+    @staticmethod
+    def available():
+        """Whether io_uring writes can be used on this platform"""
+        return sys.platform.startswith('linux') and liburing is not None
+
+    def start(self):
+        """Set up the ring and start the submission thread
+
+        Returns:
+            True if the backend is running, False if the caller should fall back
+        """
+        if not self.available():
+            return False
+
+        ring = liburing.Ring()
+        try:
+            liburing.io_uring_queue_init(self.BATCH_SIZE, ring)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"io_uring unavailable, using threaded writes: {str(e)}")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._run, args=(ring,), daemon=True)
+        self._thread.start()
+        return True
+
+    async def write(self, path, data):
+        """Write data to path, replacing any existing file
+
+        Args:
+            path: Destination file path
+            data: Content to write (str is encoded as UTF-8)
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        # The file is opened on the ring thread so the event loop never blocks on it
+        future = self._loop.create_future()
+        self._ops.put(UringOp(path, data, future))
+        await future
+
+    def close(self):
+        """Stop the submission thread once queued writes are done"""
+        if self._thread:
+            self._ops.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, ring):
+        """Submission loop: prepare up to BATCH_SIZE writes per io_uring_enter"""
+        cqe = liburing.Cqe()
+        try:
+            while True:
+                batch = [self._ops.get()]
+                while len(batch) < self.BATCH_SIZE:
+                    try:
+                        batch.append(self._ops.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = None in batch
+                batch = [op for op in batch if op is not None]
+                if batch:
+                    self._submit_batch(ring, cqe, batch)
+                if stop:
+                    break
+        finally:
+            liburing.io_uring_queue_exit(ring)
+
+    def _submit_batch(self, ring, cqe, batch):
+        """Submit one batch of writes and resolve each op's future"""
+        fds = {}
+        for index, op in enumerate(batch):
+            try:
+                fds[index] = os.open(op.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            except OSError as e:
+                self._loop.call_soon_threadsafe(self._resolve, op.future, e)
+                continue
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_write(sqe, fds[index], op.data, 0)
+            sqe.user_data = index
+        if not fds:
+            return
+        liburing.io_uring_submit(ring)
+
+        for _ in fds:
+            liburing.io_uring_wait_cqe(ring, cqe)
+            entry = cqe[0]
+            index = entry.user_data
+            op, fd = batch[index], fds[index]
+            error = None
+            try:
+                written = entry.res
+                if written < 0:
+                    raise OSError(-written, os.strerror(-written))
+                # Regular file writes rarely come back short; finish them inline
+                while written < len(op.data):
+                    written += os.pwrite(fd, op.data[written:], written)
+            except OSError as e:
+                error = e
+            finally:
+                liburing.io_uring_cqe_seen(ring, entry)
+                os.close(fd)
+            self._loop.call_soon_threadsafe(self._resolve, op.future, error)
+
+    @staticmethod
+    def _resolve(future, error):
+        """Complete an op's future on the event loop"""
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
@@ -0,0 +1,200 @@
+"""
+Compact membership filter for URLs already processed during a crawl
+"""
+
+import hashlib
+import math
+import os
+import struct
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over precomputed hash pairs"""
+
+    # Serialized header: capacity, count, num_bits, num_hashes
+    _HEADER = struct.Struct('<QQQI')
+
+    def __init__(self, capacity, error_rate):
+        """
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False-positive probability once capacity items are added
+        """
+        self.capacity = capacity
+        self.count = 0
+
+        # Optimal bit count and hash count for the requested capacity and error rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, hashes):
+        """Bit positions for an item, by enhanced double hashing of its two 64-bit hashes"""
+        m = self.num_bits
+        h1, h2 = hashes[0] % m, hashes[1] % m
+        for i in range(self.num_hashes):
+            yield h1
+            # Plain h1 + i*h2 cycles over few bits when h2 shares factors with m
+            h1 = (h1 + h2) % m
+            h2 = (h2 + i + 1) % m
+
+    def add(self, hashes):
+        """Set the item's bits"""
+        for pos in self._positions(hashes):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, hashes):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hashes))
+
+    def dump(self, f):
+        """Write the filter's header and bits to a binary file"""
+        f.write(self._HEADER.pack(self.capacity, self.count, self.num_bits, self.num_hashes))
+        f.write(self._bits)
+
+    @classmethod
+    def read(cls, f):
+        """Read a filter written by dump()"""
+        capacity, count, num_bits, num_hashes = _unpack(cls._HEADER, f)
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.count = capacity, count
+        bloom.num_bits, bloom.num_hashes = num_bits, num_hashes
+        bloom._bits = bytearray(f.read((num_bits + 7) // 8))
+        if len(bloom._bits) != (num_bits + 7) // 8:
+            raise ValueError("Truncated URL filter file")
+        return bloom
+
+
+class SeenUrls:
+    """Set-like record of processed URLs using a few bytes per URL
+
+    A scalable Bloom filter (new, larger slices with tighter error rates are
+    added as it fills) holds every URL, and an exact LRU of recent URLs answers
+    the most frequent lookups without any chance of a false positive.
+    """
+
+    # Growth of each new slice's capacity and tightening of its error rate
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    # File signature and header (URL count, next slice capacity and error rate, slice count)
+    MAGIC = b'WBSEEN1\n'
+    _HEADER = struct.Struct('<QQdI')
+
+    def __init__(self, initial_capacity=100_000, error_rate=1e-6, recent=4096):
+        """
+        Args:
+            initial_capacity: URLs the first Bloom filter slice is sized for
+            error_rate: Overall false-positive probability to stay under
+            recent: Number of most recently added URLs kept exactly
+        """
+        self.recent = recent
+        self._recent = OrderedDict()
+        self._count = 0
+
+        # Slice error rates form a geometric series summing to error_rate
+        self._next_capacity = initial_capacity
+        self._next_error_rate = error_rate * (1 - self.TIGHTENING)
+        self._filters = []
+        self._grow()
+
+    def _grow(self):
+        """Add an empty, larger slice"""
+        self._filters.append(BloomFilter(self._next_capacity, self._next_error_rate))
+        self._next_capacity *= self.GROWTH
+        self._next_error_rate *= self.TIGHTENING
+
+    @staticmethod
+    def _hash(url):
+        """Two independent 64-bit hashes of url"""
+        digest = hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+    def add(self, url):
+        """Record url as seen"""
+        if url in self._recent:
+            self._recent.move_to_end(url)
+            return
+
+        hashes = self._hash(url)
+        if not any(hashes in f for f in self._filters):
+            current = self._filters[-1]
+            if current.count >= current.capacity:
+                self._grow()
+                current = self._filters[-1]
+            current.add(hashes)
+            self._count += 1
+
+        self._recent[url] = None
+        if len(self._recent) > self.recent:
+            self._recent.popitem(last=False)
+
+    def __contains__(self, url):
+        if url in self._recent:
+            return True
+        hashes = self._hash(url)
+        return any(hashes in f for f in reversed(self._filters))
+
+    def __len__(self):
+        """Number of distinct URLs added (approximate after false positives)"""
+        return self._count
+
+    def save(self, path):
+        """
+        Write the filter to path, replacing it atomically
+
+        Only the Bloom filter slices are written; every URL in the exact LRU
+        is also in them.
+
+        Args:
+            path: Destination Path
+        """
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(self._HEADER.pack(self._count, self._next_capacity, self._next_error_rate, len(self._filters)))
+            for bloom in self._filters:
+                bloom.dump(f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, recent=4096):
+        """
+        Read a filter written by save()
+
+        Args:
+            path: Path to the saved filter
+            recent: Number of most recently added URLs kept exactly
+
+        Returns:
+            SeenUrls holding every URL of the saved one
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a saved filter
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"Not a saved URL filter: {path}")
+            count, next_capacity, next_error_rate, num_filters = _unpack(cls._HEADER, f)
+            filters = [BloomFilter.read(f) for _ in range(num_filters)]
+
+        if not filters:
+            raise ValueError(f"Not a saved URL filter: {path}")
+        seen = cls.__new__(cls)
+        seen.recent = recent
+        seen._recent = OrderedDict()
+        seen._count = count
+        seen._next_capacity = next_capacity
+        seen._next_error_rate = next_error_rate
+        seen._filters = filters
+        return seen
+
+
+def _unpack(header, f):
+    """Read and unpack one struct header from a binary file"""
+    data = f.read(header.size)
+    if len(data) != header.size:
+        raise ValueError("Truncated URL filter file")
+    return header.unpack(data)
@@ -2,9 +2,43 @@
 Utility functions for Wayback Machine Downloader
 """
 
+import atexit
+import json
 import logging
+import os
+import queue
 import re
 from datetime import datetime
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
+
+from .wayback_api import WaybackAPI
+
+# Patterns used on every call, compiled once at import
+_TIMESTAMP_RE = re.compile(r'^\d{14}$')
+
+# Filename sanitizing in one pass: reserved characters become '_', control characters are dropped
+_SANITIZE_TABLE = str.maketrans(
+    {**{c: '_' for c in '<>:"/\\|?*'}, **{chr(i): None for i in (*range(32), 0x7f)}}
+)
+
+# Units used by format_bytes, each 1024 times the previous one
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Ports implied by each scheme, dropped from canonical URLs
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Common non-HTML extensions (without the dot) that are never followed as pages
+_SKIP_EXTENSIONS = frozenset((
+    'jpg', 'jpeg', 'png', 'gif', 'svg', 'webp', 'ico',
+    'css', 'js', 'json', 'xml',
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
+    'zip', 'rar', 'tar', 'gz', '7z',
+    'mp4', 'avi', 'mov', 'wmv', 'flv', 'webm',
+    'mp3', 'wav', 'ogg', 'm4a', 'flac',
+    'ttf', 'otf', 'woff', 'woff2', 'eot'
+))
 
 
 def setup_logging(verbose=False):
@@ -23,9 +57,16 @@ def setup_logging(verbose=False):
     logger = logging.getLogger('wbdownloader')
     logger.setLevel(level)
     
-    # Create console handler
+    # Already set up by an earlier call: only the level changes, so handlers
+    # (and listener threads) are not stacked
+    if logger.handlers:
+        return logger
+    
+    # Records are written here only, not again by the root logger
+    logger.propagate = False
+    
+    # Create console handler; the logger's level does the filtering
     handler = logging.StreamHandler()
-    handler.setLevel(level)
     
     # Create formatter
     if verbose:
@@ -37,8 +78,15 @@ def setup_logging(verbose=False):
     
     handler.setFormatter(formatter)
     
-    # Add handler to logger
-    logger.addHandler(handler)
+    # Log calls only enqueue the record; a background listener thread does the
+    # formatting and console I/O, so download coroutines never block on stderr
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    
+    # Drain records still queued when the process exits
+    atexit.register(listener.stop)
     
     return logger
 
@@ -54,7 +102,7 @@ def validate_timestamp(timestamp):
         Boolean indicating if timestamp is valid
     """
     # Check format: YYYYMMDDHHMMSS (14 digits)
-    if not re.match(r'^\d{14}$', timestamp):
+    if not _TIMESTAMP_RE.match(timestamp):
         return False
     
     # Try to parse as datetime
@@ -78,8 +126,6 @@ def validate_proxy_url(proxy_url):
     if not proxy_url:
         return True  # None/empty is valid (no proxy)
     
-    from urllib.parse import urlparse
-    
     try:
         parsed = urlparse(proxy_url)
         
@@ -106,6 +152,71 @@ def validate_proxy_url(proxy_url):
         return False
 
 
+def load_json_index(path):
+    """
+    Load a JSON object persisted in the output directory
+    
+    Args:
+        path: Path to the JSON file
+        
+    Returns:
+        Loaded dictionary, or an empty one if the file is missing or unreadable
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json_index(path, data):
+    """
+    Persist a dictionary as JSON, removing the file when there is nothing to keep
+    
+    Args:
+        path: Path to the JSON file
+        data: Dictionary to save
+    """
+    if data:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    elif path.exists():
+        path.unlink()
+
+
+def scan_files(directory, logger=None):
+    """
+    List every file under a directory
+    
+    Args:
+        directory: Directory to walk; a missing one has no files
+        logger: Logger instance for directories that cannot be read
+        
+    Returns:
+        List of file paths as strings
+    """
+    found = []
+    
+    # Iterative walk on plain strings; DirEntry caches the file type
+    stack = [str(directory)] if os.path.isdir(directory) else []
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        found.append(entry.path)
+        except OSError as e:
+            if logger:
+                logger.debug(f"Error scanning {current}: {str(e)}")
+    
+    return found
+
+
 def format_bytes(num_bytes):
     """
     Format bytes to human readable format
@@ -116,11 +227,12 @@ def format_bytes(num_bytes):
     Returns:
         Formatted string
     """
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if abs(num_bytes) < 1024.0:
-            return f"{num_bytes:3.1f} {unit}"
-        num_bytes /= 1024.0
-    return f"{num_bytes:.1f} PB"
+    # Pick the unit from the bit length of the magnitude: each unit spans 10 bits
+    index = min(max(int(abs(num_bytes)).bit_length() - 1, 0) // 10, len(_BYTE_UNITS) - 1)
+    value = num_bytes / (1 << (10 * index))
+    if index == len(_BYTE_UNITS) - 1:
+        return f"{value:.1f} {_BYTE_UNITS[index]}"
+    return f"{value:3.1f} {_BYTE_UNITS[index]}"
 
 
 def sanitize_filename(filename):
@@ -133,11 +245,8 @@ def sanitize_filename(filename):
     Returns:
         Sanitized filename
     """
-    # Replace problematic characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    
-    # Remove control characters
-    filename = re.sub(r'[\x00-\x1f\x7f]', '', filename)
+    # Replace problematic characters and remove control characters in one pass
+    filename = filename.translate(_SANITIZE_TABLE)
     
     # Limit length
     max_length = 255
@@ -162,15 +271,16 @@ def is_valid_url(url):
     Returns:
         Boolean indicating if URL is valid
     """
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE
-    )
-    return url_pattern.match(url) is not None
+    # A straight parse instead of a backtracking pattern: http(s), a host and a sane port
+    try:
+        parsed = urlsplit(url)
+        return (
+            parsed.scheme in ('http', 'https')
+            and bool(parsed.hostname)
+            and (parsed.port is None or 1 <= parsed.port <= 65535)
+        )
+    except ValueError:
+        return False
 
 
 def extract_domain_from_url(url):
@@ -183,8 +293,6 @@ def extract_domain_from_url(url):
     Returns:
         Domain name
     """
-    from urllib.parse import urlparse
-    
     parsed = urlparse(url)
     domain = parsed.netloc or parsed.path.split('/')[0]
     
@@ -199,88 +307,113 @@ def extract_domain_from_url(url):
     return domain
 
 
-def is_same_domain(url1, url2):
+@lru_cache(maxsize=4096)
+def normalize_domain(url):
     """
-    Check if two URLs belong to the same domain
+    Domain of URL as used for same-site checks
     
     Args:
-        url1: First URL
-        url2: Second URL
+        url: URL, possibly a Wayback Machine URL
         
     Returns:
-        Boolean indicating if URLs are from same domain
+        Lowercased domain without www. prefix or port
     """
-    from urllib.parse import urlparse
-    
     # Handle Wayback URLs - extract original URLs first
-    from .wayback_api import WaybackAPI
-    wayback_api = WaybackAPI()
+    if 'web.archive.org' in url:
+        url = WaybackAPI.extract_original_url(url)
     
-    # Extract original URLs if they are Wayback URLs
-    if 'web.archive.org' in url1:
-        url1 = wayback_api.extract_original_url(url1)
-    if 'web.archive.org' in url2:
-        url2 = wayback_api.extract_original_url(url2)
+    # hostname is already lowercased and stripped of port and credentials
+    domain = urlsplit(url).hostname or ''
     
-    # Parse URLs
-    parsed1 = urlparse(url1)
-    parsed2 = urlparse(url2)
+    # Remove www prefix for comparison
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def canonicalize(url):
+    """
+    Canonical form of a URL, so equivalent spellings dedupe to one key
     
-    # Get domains
-    domain1 = parsed1.netloc.lower()
-    domain2 = parsed2.netloc.lower()
+    Lowercases scheme and host, drops default ports and the fragment, sorts
+    query parameters and gives an empty path a '/'. For Wayback URLs the
+    archived URL after the timestamp is canonicalized.
     
-    # Remove www prefix for comparison
-    if domain1.startswith('www.'):
-        domain1 = domain1[4:]
-    if domain2.startswith('www.'):
-        domain2 = domain2[4:]
+    Args:
+        url: URL to canonicalize
+        
+    Returns:
+        Canonical URL string (url itself if it cannot be parsed)
+    """
+    prefix = WaybackAPI.BASE_URL + '/'
+    if url.startswith(prefix):
+        timestamp, sep, original = url[len(prefix):].partition('/')
+        if sep:
+            return f"{prefix}{timestamp}/{canonicalize(original)}"
     
-    # Remove port for comparison
-    domain1 = domain1.split(':')[0]
-    domain2 = domain2.split(':')[0]
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname or ''
+    if ':' in netloc:
+        # IPv6 literal
+        netloc = f"[{netloc}]"
+    if port is not None and _DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    if '@' in parts.netloc:
+        netloc = f"{parts.netloc.rpartition('@')[0]}@{netloc}"
+    
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True))) if parts.query else ''
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def is_same_domain(url1, url2):
+    """
+    Check if two URLs belong to the same domain
     
-    return domain1 == domain2
+    Args:
+        url1: First URL
+        url2: Second URL
+        
+    Returns:
+        Boolean indicating if URLs are from same domain
+    """
+    return normalize_domain(url1) == normalize_domain(url2)
 
 
-def should_download_url(url, base_url, downloaded_urls=None):
+def should_download_url(url, base_domain, downloaded_urls=None):
     """
     Determine if a URL should be downloaded based on filtering rules
     
     Args:
         url: URL to check
-        base_url: Base URL for domain comparison
+        base_domain: Domain of the site being crawled, from normalize_domain()
         downloaded_urls: Set of already downloaded URLs
         
     Returns:
         Boolean indicating if URL should be downloaded
     """
-    # Check if same domain
-    if not is_same_domain(url, base_url):
+    # Check if already downloaded
+    if downloaded_urls is not None and url in downloaded_urls:
         return False
     
-    # Check if already downloaded
-    if downloaded_urls and url in downloaded_urls:
+    return _is_wanted_link(url, base_domain)
+
+
+@lru_cache(maxsize=65536)
+def _is_wanted_link(url, base_domain):
+    """Extension and domain rules of should_download_url, memoized as pages share most links"""
+    # Skip non-HTML files before the costlier domain comparison; one set lookup
+    # on the text after the last dot, however many extensions are listed
+    path = urlparse(url).path
+    dot = path.rfind('.')
+    if dot >= 0 and path[dot + 1:].lower() in _SKIP_EXTENSIONS:
         return False
     
-    # Skip certain file extensions that are not HTML pages
-    from urllib.parse import urlparse
-    parsed = urlparse(url)
-    path = parsed.path.lower()
-    
-    # Common non-HTML extensions to skip
-    skip_extensions = [
-        '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
-        '.css', '.js', '.json', '.xml',
-        '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-        '.zip', '.rar', '.tar', '.gz', '.7z',
-        '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm',
-        '.mp3', '.wav', '.ogg', '.m4a', '.flac',
-        '.ttf', '.otf', '.woff', '.woff2', '.eot'
-    ]
-    
-    for ext in skip_extensions:
-        if path.endswith(ext):
-            return False
+    # Check if same domain
+    if normalize_domain(url) != base_domain:
+        return False
     
     return True
\ No newline at end of file
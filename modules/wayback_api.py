@@ -2,6 +2,8 @@
 Wayback Machine API interactions
 """
 
+import re
+from functools import lru_cache
 from urllib.parse import quote
 
 
@@ -10,10 +12,17 @@ class WaybackAPI:
     
     BASE_URL = "https://web.archive.org/web"
     
+    # Timestamp followed by a modifier such as im_ or js_
+    _MODIFIER_RE = re.compile(r'(/web/\d{14})(im_|js_|cs_|if_|id_|oe_|)(/)')
+    
     def __init__(self):
         pass
     
-    def construct_url(self, original_url, timestamp):
+    # The URL helpers below are pure functions of their arguments, and the same page
+    # and asset URLs recur across pages, so their results are memoized
+    
+    @staticmethod
+    def construct_url(original_url, timestamp):
         """
         Construct a Wayback Machine URL from original URL and timestamp
         
@@ -29,10 +38,12 @@ class WaybackAPI:
             original_url = 'http://' + original_url
         
         # Construct Wayback URL
-        wayback_url = f"{self.BASE_URL}/{timestamp}/{original_url}"
+        wayback_url = f"{WaybackAPI.BASE_URL}/{timestamp}/{original_url}"
         return wayback_url
     
-    def extract_original_url(self, wayback_url):
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def extract_original_url(wayback_url):
         """
         Extract the original URL from a Wayback Machine URL
         
@@ -42,22 +53,21 @@ class WaybackAPI:
         Returns:
             Original URL
         """
-        # Remove Wayback prefix
-        if wayback_url.startswith(self.BASE_URL):
-            # Find the timestamp part (14 digits after /web/)
-            parts = wayback_url.split('/')
-            for i, part in enumerate(parts):
-                if part == 'web' and i + 2 < len(parts):
-                    # Skip 'web' and timestamp
-                    original_url = '/'.join(parts[i+2:])
-                    # Ensure protocol
-                    if not original_url.startswith(('http://', 'https://')):
-                        original_url = 'http://' + original_url
-                    return original_url
+        # Remove Wayback prefix and the timestamp segment after it, without splitting
+        prefix = WaybackAPI.BASE_URL + '/'
+        if wayback_url.startswith(prefix):
+            _, sep, original_url = wayback_url[len(prefix):].partition('/')
+            if sep:
+                # Ensure protocol
+                if not original_url.startswith(('http://', 'https://')):
+                    original_url = 'http://' + original_url
+                return original_url
         
         return wayback_url
     
-    def convert_to_wayback_url(self, url, base_wayback_url):
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def convert_to_wayback_url(url, base_wayback_url):
         """
         Convert a regular URL to Wayback Machine URL using the same timestamp
         
@@ -69,23 +79,25 @@ class WaybackAPI:
             Wayback Machine URL
         """
         # Extract timestamp from base URL
-        timestamp = self.extract_timestamp(base_wayback_url)
+        timestamp = WaybackAPI.extract_timestamp(base_wayback_url)
         if not timestamp:
             return url
         
         # Handle already-wayback URLs
-        if url.startswith(self.BASE_URL):
+        if url.startswith(WaybackAPI.BASE_URL):
             # Clean it first to remove modifiers
-            return self.clean_wayback_url(url)
+            return WaybackAPI.clean_wayback_url(url)
         
         # Handle protocol-relative URLs
         if url.startswith('//'):
             url = 'https:' + url
         
         # Construct new Wayback URL
-        return self.construct_url(url, timestamp)
+        return WaybackAPI.construct_url(url, timestamp)
     
-    def extract_timestamp(self, wayback_url):
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def extract_timestamp(wayback_url):
         """
         Extract timestamp from Wayback Machine URL
         
@@ -95,15 +107,19 @@ class WaybackAPI:
         Returns:
             Timestamp string or None
         """
-        if self.BASE_URL in wayback_url:
-            # Use regex to find timestamp (14 digits) even with modifiers
-            import re
-            match = re.search(r'/web/(\d{14})', wayback_url)
-            if match:
-                return match.group(1)
+        if WaybackAPI.BASE_URL in wayback_url:
+            # First /web/ followed by 14 digits, even with a modifier after them
+            index = wayback_url.find('/web/')
+            while index != -1:
+                timestamp = wayback_url[index + 5:index + 19]
+                if len(timestamp) == 14 and timestamp.isdigit():
+                    return timestamp
+                index = wayback_url.find('/web/', index + 1)
         return None
     
-    def clean_wayback_url(self, url):
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def clean_wayback_url(url):
         """
         Clean and normalize Wayback Machine URL
         
@@ -113,16 +129,17 @@ class WaybackAPI:
         Returns:
             Cleaned URL
         """
+        # Every modifier ends in '_', so URLs without one need no cleaning
+        if '_' not in url:
+            return url
+        
         # Remove any Wayback toolbar parameters
-        if '_' in url and '/http' in url:
+        if '/http' in url:
             # Handle URLs like /web/20240417160532_/http://example.com
             url = url.replace('_/', '/')
         
         # Remove im_ or js_ or cs_ modifiers
         # These appear after the timestamp
-        import re
-        # Pattern to match timestamp followed by modifier
-        pattern = r'(/web/\d{14})(im_|js_|cs_|if_|id_|oe_|)(/)'        
-        url = re.sub(pattern, r'\1\3', url)
+        url = WaybackAPI._MODIFIER_RE.sub(r'\1\3', url)
         
         return url
\ No newline at end of file
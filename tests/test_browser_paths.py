@@ -0,0 +1,90 @@
+"""
+Regression tests for the browser downloader's local path mapping
+"""
+
+import random
+import unittest
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+
+from modules.browser_downloader import _compute_path
+
+
+def _reference_path(url, output_dir):
+    """The urlparse/Path based mapping _compute_path must keep matching"""
+    parsed = urlparse(url)
+    
+    path = unquote(parsed.path)
+    if not path or path == '/':
+        path = '/index.html'
+    elif path.endswith('/'):
+        path += 'index.html'
+    
+    if path.startswith('/'):
+        path = path[1:]
+    
+    if parsed.query:
+        query_safe = parsed.query.replace('&', '_').replace('=', '_')
+        base, ext = Path(path).stem, Path(path).suffix
+        path = f"{base}_{query_safe}{ext}"
+    
+    if not Path(path).suffix:
+        path += '.html'
+    
+    return str(Path(output_dir) / path)
+
+
+class ComputePathTest(unittest.TestCase):
+    
+    OUTPUT_DIR = '/out'
+    
+    URLS = (
+        'http://a.com',
+        'http://a.com/',
+        'http://a.com?x=1',
+        'http://a.com#top',
+        'http://a.com/#top',
+        'http://a.com/a;p=1',
+        'http://a.com/a;jsessionid=ABC123?x=1',
+        'http://a.com/a;p=1/b.css',
+        'http://a.com/dir;v=2/page;jsessionid=1.jsp',
+        'http://a.com/;p',
+        'https://a.com/a.b/c',
+        'https://a.com/page.php?id=3&lang=en#frag',
+        'https://a.com/img/logo.png#x?y',
+        'https://a.com/foo.',
+        'https://a.com/.hidden',
+        'https://a.com/x/../y',
+        'https://a.com/%7Euser/caf%C3%A9.html',
+        'https://user:pw@a.com:8080/p/q/?a=b',
+        'https://[::1]:80/ipv6.html',
+        'HTTP://A.COM/upper',
+        'ftp://a.com/file;type=a',
+        'https://a.com/tab\there',
+        '//a.com/relative',
+        'just/a/path',
+    )
+    
+    def test_matches_reference_mapping(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    _compute_path(url, False, self.OUTPUT_DIR),
+                    _reference_path(url, self.OUTPUT_DIR)
+                )
+    
+    def test_matches_reference_mapping_on_random_urls(self):
+        rng = random.Random(0)
+        alphabet = 'ab./;=&?#%2F'
+        for _ in range(2000):
+            tail = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            url = 'http://a.com/' + tail
+            with self.subTest(url=url):
+                self.assertEqual(
+                    _compute_path(url, False, self.OUTPUT_DIR),
+                    _reference_path(url, self.OUTPUT_DIR)
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Tests for inline style extraction in the asset parser
+"""
+
+import unittest
+
+from modules.parser import AssetParser
+
+
+BASE_URL = 'https://web.archive.org/web/20200101000000/http://example.com/'
+
+
+class InlineStyleTest(unittest.TestCase):
+    
+    HTML = '''<html><head>
+        <!-- <div style="background: url(commented.png)"></div> -->
+        <script>var tpl = '<div style="background: url(script.png)"></div>';</script>
+        </head><body>
+        <div style="background: url(real.png)"></div>
+        <p STYLE='background-image: url(&quot;upper.png&quot;)'></p>
+        <div data-style="background: url(fake.png)"></div>
+        <span x-style='background: url(dashed.png)'></span>
+        </body></html>'''
+    
+    def setUp(self):
+        self.parser = AssetParser(max_workers=1)
+    
+    def tearDown(self):
+        self.parser.close()
+    
+    def _style_urls(self, content):
+        assets = self.parser._extract_assets_sync(content, BASE_URL)
+        return sorted(a.original_url.rsplit('/', 1)[1] for a in assets)
+    
+    def test_only_real_style_attributes_yield_assets(self):
+        self.assertEqual(self._style_urls(self.HTML), ['real.png', 'upper.png'])
+    
+    def test_bytes_markup_matches_text_markup(self):
+        self.assertEqual(self._style_urls(self.HTML.encode()), ['real.png', 'upper.png'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,56 +6,169 @@ A CLI tool to download websites from the Internet Archive's Wayback Machine
 
 import argparse
 import asyncio
+import logging
+import signal
 import sys
 from pathlib import Path
 from urllib.parse import urlparse
 from collections import deque
+from typing import NamedTuple
 
 from modules.wayback_api import WaybackAPI
 from modules.parser import AssetParser
 from modules.downloader import AsyncDownloader
 from modules.browser_downloader import BrowserDownloader
-from modules.utils import setup_logging, validate_timestamp, should_download_url, validate_proxy_url
+from modules.url_filter import SeenUrls
+from modules.utils import (
+    setup_logging, validate_timestamp, should_download_url, validate_proxy_url, normalize_domain,
+    canonicalize, load_json_index, save_json_index
+)
 
 
-async def download_with_http(downloader, wayback_api, parser, args, logger):
+class Page(NamedTuple):
+    """A page queued for crawling, with its Wayback and original URLs and dedup key"""
+    wayback_url: str
+    original_url: str
+    key: str
+
+
+# Crawl checkpoint written to the output directory after every level
+VISITED_FILE = '.visited.bloom'
+FRONTIER_FILE = '.frontier.json'
+
+
+def load_crawl_state(output_dir, args, logger):
+    """
+    Restore the processed pages and pending pages of an earlier crawl, for --resume
+    
+    Args:
+        output_dir: Output directory holding the checkpoint
+        args: Parsed command line arguments
+        logger: Logger instance
+        
+    Returns:
+        Tuple of (processed page keys, level to start at, pages of that level),
+        with pages None when the crawl starts from the initial URL
+    """
+    if args.resume:
+        frontier = load_json_index(output_dir / FRONTIER_FILE)
+        if frontier.get('url') == args.url and frontier.get('snapshot') == args.snapshot:
+            try:
+                downloaded_urls = SeenUrls.load(output_dir / VISITED_FILE)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Cannot resume, checkpoint is unreadable: {str(e)}")
+            else:
+                pages = [Page(*page) for page in frontier['pages']]
+                logger.info(f"Resuming at level {frontier['level']}: {len(pages)} pages pending, "
+                            f"{len(downloaded_urls)} already processed")
+                return downloaded_urls, frontier['level'], pages
+        else:
+            logger.warning("No checkpoint for this URL and snapshot, starting from the beginning")
+    
+    return SeenUrls(), 1, None
+
+
+def save_crawl_state(output_dir, args, downloaded_urls, level, pages):
+    """
+    Checkpoint a crawl between levels so --resume can continue it (run in a worker thread)
+    
+    Args:
+        output_dir: Output directory to write the checkpoint to
+        args: Parsed command line arguments
+        downloaded_urls: SeenUrls of processed page keys
+        level: Level the pending pages belong to
+        pages: Pending Page tuples
+    """
+    # Frontier first: if the run dies in between, the older processed set only
+    # means some pages get processed again, never that pending pages are lost
+    save_json_index(output_dir / FRONTIER_FILE, {
+        'url': args.url,
+        'snapshot': args.snapshot,
+        'level': level,
+        'pages': pages
+    })
+    downloaded_urls.save(output_dir / VISITED_FILE)
+
+
+async def run_until_interrupted(crawl):
+    """
+    Run a crawl, stopping it cleanly on the first Ctrl+C
+    
+    The crawl task is cancelled so in-flight downloads unwind (removing partial
+    files) while the caller's downloader can still flush queued writes on exit;
+    a second Ctrl+C interrupts immediately.
+    
+    Args:
+        crawl: Crawl coroutine to run
+        
+    Returns:
+        True if the crawl finished, False if it was interrupted
+    """
+    loop = asyncio.get_running_loop()
+    crawl_task = asyncio.ensure_future(crawl)
+    interrupted = False
+    
+    def _interrupt():
+        nonlocal interrupted
+        interrupted = True
+        crawl_task.cancel()
+        # Restore the default handler, so a second Ctrl+C raises KeyboardInterrupt
+        loop.remove_signal_handler(signal.SIGINT)
+    
+    try:
+        loop.add_signal_handler(signal.SIGINT, _interrupt)
+    except NotImplementedError:
+        # Event loops on Windows have no signal handlers; Ctrl+C stays a hard stop there
+        pass
+    
+    try:
+        await crawl_task
+    except asyncio.CancelledError:
+        if not interrupted:
+            raise
+    finally:
+        if not interrupted:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except NotImplementedError:
+                pass
+    
+    return not interrupted
+
+
+async def download_with_http(downloader, wayback_api, parser, args, logger, output_dir):
     """Handle downloads using HTTP mode (original implementation)"""
-    downloaded_urls = set()
-    pages_queue = deque()
+    # Processed pages, and where to start, from the last checkpoint when resuming
+    downloaded_urls, start_level, resumed_pages = await asyncio.to_thread(
+        load_crawl_state, output_dir, args, logger
+    )
     
     # Construct initial Wayback URL
     initial_wayback_url = wayback_api.construct_url(args.url, args.snapshot)
     logger.info(f"Starting download from: {initial_wayback_url}")
     
-    # Add initial URL to queue
-    pages_queue.append({
-        'wayback_url': initial_wayback_url,
-        'original_url': args.url,
-        'level': 1
-    })
+    # Domain links are compared against, normalized once for the whole crawl
+    base_domain = normalize_domain(args.url)
     
-    # Process pages level by level
-    current_level = 1
+    # Pages to crawl, in level order; start with the initial URL unless resuming
+    if resumed_pages is None:
+        resumed_pages = [Page(initial_wayback_url, args.url, canonicalize(initial_wayback_url))]
+    pages_queue = deque(resumed_pages)
     
-    while pages_queue and current_level <= args.level:
-        # Get all pages at current level
-        pages_at_level = []
-        while pages_queue and pages_queue[0]['level'] == current_level:
-            pages_at_level.append(pages_queue.popleft())
-        
-        if pages_at_level:
-            logger.info(f"\n=== Processing Level {current_level} ===")
-            logger.info(f"Pages to download: {len(pages_at_level)}")
-        
-        # Download all pages at current level
-        for page_info in pages_at_level:
-            wayback_url = page_info['wayback_url']
-            original_url = page_info['original_url']
-            
-            # Skip if already processed
-            if wayback_url in downloaded_urls:
-                logger.debug(f"Skipping already processed: {original_url}")
-                continue
+    # Keys queued for the next level, so a link found on several pages is queued once
+    next_keys = set()
+    
+    # Stylesheet wayback URL -> assets it references, so a shared stylesheet is
+    # fetched and parsed once per crawl rather than once per page
+    css_embedded_cache = {}
+    
+    # Pages of a level are fetched concurrently, at most --concurrent at a time
+    page_slots = asyncio.Semaphore(args.concurrent)
+    
+    async def _process_page(page, level, is_main):
+        """Download one page and its assets, and queue its links for the next level"""
+        async with page_slots:
+            wayback_url, original_url, key = page
             
             logger.info(f"Processing: {original_url}")
             
@@ -63,41 +176,59 @@ async def download_with_http(downloader, wayback_api, parser, args, logger):
             page_content, page_path = await downloader.download_file(
                 wayback_url,
                 original_url,
-                is_main=(current_level == 1 and page_info == pages_at_level[0])
+                is_main=is_main
             )
             
             if not page_content:
                 logger.warning(f"Failed to get content for: {original_url}")
-                continue
+                return
             
             # Mark as processed
-            downloaded_urls.add(wayback_url)
+            downloaded_urls.add(key)
+            
+            # Parse the page once for both asset and link extraction, if either is needed
+            if not args.no_assets or level < args.level:
+                page_soup = await parser.parse(page_content)
             
             # Extract and download assets from this page immediately (unless --no-assets flag is set)
             if not args.no_assets:
                 logger.debug(f"Parsing and downloading assets from: {original_url}")
-                page_assets = parser.extract_assets(page_content, wayback_url)
-                
-                # Parse CSS files for additional assets
-                css_assets = [asset for asset in page_assets if asset and asset['type'] == 'css']
-                for css_asset in css_assets:
-                    css_url = css_asset['wayback_url']
-                    logger.debug(f"Downloading CSS for parsing: {css_url}")
-                    css_content, _ = await downloader.download_file(
-                        css_url,
-                        css_asset['original_url'],
-                        save=False
-                    )
-                    if css_content:
-                        css_embedded_assets = parser.extract_css_assets(css_content, css_url)
-                        page_assets.extend(css_embedded_assets)
+                page_assets = await parser.extract_assets(page_soup, wayback_url)
                 
-                # Remove duplicates for this page
+                # One pass drops repeated URLs and picks out the stylesheets to parse
                 unique_page_assets = []
                 seen_asset_urls = set()
+                css_embedded_assets = []
+                css_to_fetch = []
                 for asset in page_assets:
-                    if asset and asset['wayback_url'] not in seen_asset_urls:
-                        seen_asset_urls.add(asset['wayback_url'])
+                    if asset and asset.wayback_url not in seen_asset_urls:
+                        seen_asset_urls.add(asset.wayback_url)
+                        unique_page_assets.append(asset)
+                        if asset.type == 'css':
+                            if asset.wayback_url in css_embedded_cache:
+                                css_embedded_assets.extend(css_embedded_cache[asset.wayback_url])
+                            else:
+                                css_to_fetch.append(asset)
+                
+                # Fetch the stylesheets not parsed yet concurrently, then parse them for additional assets
+                if css_to_fetch:
+                    logger.debug(f"Downloading {len(css_to_fetch)} CSS files for parsing")
+                    css_results = await asyncio.gather(
+                        *(downloader.download_file(css_asset.wayback_url, css_asset.original_url, save=False)
+                          for css_asset in css_to_fetch),
+                        return_exceptions=True
+                    )
+                    for css_asset, result in zip(css_to_fetch, css_results):
+                        if isinstance(result, Exception) or not result[0]:
+                            continue
+                        css_url = css_asset.wayback_url
+                        css_embedded_cache[css_url] = await parser.extract_css_assets(result[0], css_url)
+                        css_embedded_assets.extend(css_embedded_cache[css_url])
+                
+                # Add the stylesheets' assets that the page itself did not reference
+                for asset in css_embedded_assets:
+                    if asset and asset.wayback_url not in seen_asset_urls:
+                        seen_asset_urls.add(asset.wayback_url)
                         unique_page_assets.append(asset)
                 
                 if unique_page_assets:
@@ -105,73 +236,108 @@ async def download_with_http(downloader, wayback_api, parser, args, logger):
                     await downloader.download_assets(unique_page_assets, sequential=args.sequential_assets)
             
             # Extract links for next level (if not at max level)
-            if current_level < args.level:
+            if level < args.level:
                 logger.debug(f"Extracting links from: {original_url}")
-                links = parser.extract_links(page_content, wayback_url)
                 
-                # Filter links
+                # Keep only links we should download while they are extracted; processed
+                # pages are tracked by wayback key, which is checked below
+                found, links = await parser.filter_links(
+                    page_soup,
+                    wayback_url,
+                    lambda link: should_download_url(link.original_url, base_domain)
+                )
+                
+                # Collect this page's new pages to queue them in one go
+                new_pages = []
                 for link in links:
-                    link_original_url = link['original_url']
-                    link_wayback_url = link['wayback_url']
-                    
-                    # Check if we should download this link
-                    if should_download_url(link_original_url, args.url, downloaded_urls):
-                        # Check if wayback URL is already queued or processed
-                        if link_wayback_url not in downloaded_urls:
-                            pages_queue.append({
-                                'wayback_url': link_wayback_url,
-                                'original_url': link_original_url,
-                                'level': current_level + 1
-                            })
+                    # Check if wayback URL is already queued or processed
+                    link_key = canonicalize(link.wayback_url)
+                    if link_key not in downloaded_urls and link_key not in next_keys:
+                        next_keys.add(link_key)
+                        new_pages.append(Page(link.wayback_url, link.original_url, link_key))
                 
-                logger.debug(f"Found {len(links)} links, queued {len([l for l in links if should_download_url(l['original_url'], args.url, downloaded_urls)])} for download")
+                pages_queue.extend(new_pages)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Found {found} links, queued {len(new_pages)} for download")
+    
+    # Process pages level by level. Every queued page belongs to the level about
+    # to start, since links found on it are only appended once its pages are taken.
+    for current_level in range(start_level, args.level + 1):
+        if not pages_queue:
+            break
         
-        # Move to next level
-        current_level += 1
+        logger.info(f"\n=== Processing Level {current_level} ===")
+        logger.info(f"Pages to download: {len(pages_queue)}")
+        
+        # Only the crawl's first page is the main page
+        main_page = pages_queue[0] if current_level == 1 else None
+        
+        # Take the level's pages. Each was queued once, but may have been
+        # processed on the previous level after being queued.
+        scheduled = []
+        for _ in range(len(pages_queue)):
+            page = pages_queue.popleft()
+            # Skip if already processed, under any equivalent spelling of the URL
+            if page.key in downloaded_urls:
+                logger.debug(f"Skipping already processed: {page.original_url}")
+                continue
+            scheduled.append(page)
+        
+        # Download all pages at current level
+        results = await asyncio.gather(
+            *(_process_page(page, current_level, page is main_page) for page in scheduled),
+            return_exceptions=True
+        )
+        for page, result in zip(scheduled, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {page.original_url}: {str(result)}")
+        
+        # Move to next level; its pages are all queued, so start tracking the one after
+        next_keys.clear()
+        
+        # Checkpoint between levels, while no page task is changing the crawl state
+        await asyncio.to_thread(
+            save_crawl_state, output_dir, args, downloaded_urls, current_level + 1, list(pages_queue)
+        )
     
     logger.info(f"\n=== Download Summary ===")
     logger.info(f"Processed {len(downloaded_urls)} pages")
     logger.info(f"Downloaded: {downloader.downloaded}, Skipped: {downloader.skipped}, Failed: {downloader.failed}")
 
 
-async def download_with_browser(downloader, wayback_api, parser, args, logger):
+async def download_with_browser(downloader, wayback_api, parser, args, logger, output_dir):
     """Handle downloads using browser mode"""
-    downloaded_urls = set()
-    pages_queue = deque()
+    # Processed pages, and where to start, from the last checkpoint when resuming
+    downloaded_urls, start_level, resumed_pages = await asyncio.to_thread(
+        load_crawl_state, output_dir, args, logger
+    )
     
     # Construct initial Wayback URL
     initial_wayback_url = wayback_api.construct_url(args.url, args.snapshot)
     logger.info(f"Starting browser download from: {initial_wayback_url}")
     
-    # Add initial URL to queue
-    pages_queue.append({
-        'wayback_url': initial_wayback_url,
-        'original_url': args.url,
-        'level': 1
-    })
+    # Domain links are compared against, normalized once for the whole crawl
+    base_domain = normalize_domain(args.url)
     
-    # Process pages level by level
-    current_level = 1
+    # Pages to crawl, in level order; start with the initial URL unless resuming
+    if resumed_pages is None:
+        resumed_pages = [Page(initial_wayback_url, args.url, canonicalize(initial_wayback_url))]
+    pages_queue = deque(resumed_pages)
     
-    while pages_queue and current_level <= args.level:
-        # Get all pages at current level
-        pages_at_level = []
-        while pages_queue and pages_queue[0]['level'] == current_level:
-            pages_at_level.append(pages_queue.popleft())
-        
-        if pages_at_level:
-            logger.info(f"\n=== Processing Level {current_level} ===")
-            logger.info(f"Pages to download: {len(pages_at_level)}")
-        
-        # Download all pages at current level
-        for page_info in pages_at_level:
-            wayback_url = page_info['wayback_url']
-            original_url = page_info['original_url']
-            
-            # Skip if already processed
-            if wayback_url in downloaded_urls:
-                logger.debug(f"Skipping already processed: {original_url}")
-                continue
+    # Keys queued for the next level, so a link found on several pages is queued once
+    next_keys = set()
+    
+    # Stylesheet wayback URL -> assets it references, so a shared stylesheet is
+    # fetched and parsed once per crawl rather than once per page
+    css_embedded_cache = {}
+    
+    # Pages of a level are fetched concurrently, at most three at a time since each holds a browser page
+    page_slots = asyncio.Semaphore(min(args.concurrent, 3))
+    
+    async def _process_page(page, level, is_main):
+        """Render one page, download its assets, and queue its links for the next level"""
+        async with page_slots:
+            wayback_url, original_url, key = page
             
             logger.info(f"Processing with browser: {original_url}")
             
@@ -179,48 +345,75 @@ async def download_with_browser(downloader, wayback_api, parser, args, logger):
             page_content, page_path = await downloader.download_page(
                 wayback_url,
                 original_url,
-                is_main=(current_level == 1 and page_info == pages_at_level[0])
+                is_main=is_main
             )
             
             if not page_content:
                 logger.warning(f"Failed to get content for: {original_url}")
-                continue
+                return
             
             # Mark as processed
-            downloaded_urls.add(wayback_url)
+            downloaded_urls.add(key)
+            
+            # Parse the page once for both asset and link extraction, if either is needed
+            if not args.no_assets or level < args.level:
+                page_soup = await parser.parse(page_content)
             
             # Extract and download assets from this page (unless --no-assets flag is set)
             if not args.no_assets:
                 logger.debug(f"Parsing assets from: {original_url}")
-                page_assets = parser.extract_assets(page_content, wayback_url)
+                page_assets = await parser.extract_assets(page_soup, wayback_url)
                 
-                # Parse CSS files for additional assets
-                css_assets = [asset for asset in page_assets if asset and asset['type'] == 'css']
-                for css_asset in css_assets:
-                    css_url = css_asset['wayback_url']
-                    logger.debug(f"Downloading CSS for parsing: {css_url}")
-                    success, _ = await downloader.download_asset(
-                        css_url,
-                        css_asset['original_url']
-                    )
-                    if success:
-                        # Read CSS content for parsing
-                        css_path = downloader._determine_file_path(css_asset['original_url'], False)
-                        if css_path.exists():
-                            try:
-                                with open(css_path, 'r', encoding='utf-8') as f:
-                                    css_content = f.read()
-                                css_embedded_assets = parser.extract_css_assets(css_content, css_url)
-                                page_assets.extend(css_embedded_assets)
-                            except:
-                                pass
-                
-                # Remove duplicates
+                # One pass drops repeated URLs and picks out the stylesheets to parse
                 unique_page_assets = []
                 seen_asset_urls = set()
+                css_embedded_assets = []
+                css_to_fetch = []
                 for asset in page_assets:
-                    if asset and asset['wayback_url'] not in seen_asset_urls:
-                        seen_asset_urls.add(asset['wayback_url'])
+                    if asset and asset.wayback_url not in seen_asset_urls:
+                        seen_asset_urls.add(asset.wayback_url)
+                        unique_page_assets.append(asset)
+                        if asset.type == 'css':
+                            if asset.wayback_url in css_embedded_cache:
+                                css_embedded_assets.extend(css_embedded_cache[asset.wayback_url])
+                            else:
+                                css_to_fetch.append(asset)
+                
+                # Fetch the stylesheets not parsed yet concurrently, then parse them for additional assets
+                if css_to_fetch:
+                    logger.debug(f"Downloading {len(css_to_fetch)} CSS files for parsing")
+                    css_results = await asyncio.gather(
+                        *(downloader.download_asset(css_asset.wayback_url, css_asset.original_url)
+                          for css_asset in css_to_fetch),
+                        return_exceptions=True
+                    )
+                    
+                    # Make sure the queued CSS writes have landed before reading them back
+                    await downloader.flush_writes()
+                    
+                    for css_asset, result in zip(css_to_fetch, css_results):
+                        if isinstance(result, Exception) or not result[0]:
+                            continue
+                        
+                        # Read CSS content for parsing
+                        css_url = css_asset.wayback_url
+                        css_path = downloader._determine_file_path(css_asset.original_url, False)
+                        try:
+                            # Read in a worker thread so large stylesheets don't stall other pages
+                            css_content = await asyncio.to_thread(
+                                css_path.read_text, encoding='utf-8', errors='replace'
+                            )
+                        except OSError as e:
+                            logger.debug(f"Could not read CSS {css_path}: {str(e)}")
+                            continue
+                        
+                        css_embedded_cache[css_url] = await parser.extract_css_assets(css_content, css_url)
+                        css_embedded_assets.extend(css_embedded_cache[css_url])
+                
+                # Add the stylesheets' assets that the page itself did not reference
+                for asset in css_embedded_assets:
+                    if asset and asset.wayback_url not in seen_asset_urls:
+                        seen_asset_urls.add(asset.wayback_url)
                         unique_page_assets.append(asset)
                 
                 if unique_page_assets:
@@ -228,29 +421,69 @@ async def download_with_browser(downloader, wayback_api, parser, args, logger):
                     await downloader.download_assets_batch(unique_page_assets)
             
             # Extract links for next level (if not at max level)
-            if current_level < args.level:
+            if level < args.level:
                 logger.debug(f"Extracting links from: {original_url}")
-                links = parser.extract_links(page_content, wayback_url)
                 
-                # Filter links
+                # Keep only links we should download while they are extracted; processed
+                # pages are tracked by wayback key, which is checked below
+                found, links = await parser.filter_links(
+                    page_soup,
+                    wayback_url,
+                    lambda link: should_download_url(link.original_url, base_domain)
+                )
+                
+                # Collect this page's new pages to queue them in one go
+                new_pages = []
                 for link in links:
-                    link_original_url = link['original_url']
-                    link_wayback_url = link['wayback_url']
-                    
-                    # Check if we should download this link
-                    if should_download_url(link_original_url, args.url, downloaded_urls):
-                        # Check if wayback URL is already queued or processed
-                        if link_wayback_url not in downloaded_urls:
-                            pages_queue.append({
-                                'wayback_url': link_wayback_url,
-                                'original_url': link_original_url,
-                                'level': current_level + 1
-                            })
+                    # Check if wayback URL is already queued or processed
+                    link_key = canonicalize(link.wayback_url)
+                    if link_key not in downloaded_urls and link_key not in next_keys:
+                        next_keys.add(link_key)
+                        new_pages.append(Page(link.wayback_url, link.original_url, link_key))
                 
-                logger.debug(f"Found {len(links)} links, queued {len([l for l in links if should_download_url(l['original_url'], args.url, downloaded_urls)])} for download")
+                pages_queue.extend(new_pages)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Found {found} links, queued {len(new_pages)} for download")
+    
+    # Process pages level by level. Every queued page belongs to the level about
+    # to start, since links found on it are only appended once its pages are taken.
+    for current_level in range(start_level, args.level + 1):
+        if not pages_queue:
+            break
+        
+        logger.info(f"\n=== Processing Level {current_level} ===")
+        logger.info(f"Pages to download: {len(pages_queue)}")
+        
+        # Only the crawl's first page is the main page
+        main_page = pages_queue[0] if current_level == 1 else None
+        
+        # Take the level's pages. Each was queued once, but may have been
+        # processed on the previous level after being queued.
+        scheduled = []
+        for _ in range(len(pages_queue)):
+            page = pages_queue.popleft()
+            # Skip if already processed, under any equivalent spelling of the URL
+            if page.key in downloaded_urls:
+                logger.debug(f"Skipping already processed: {page.original_url}")
+                continue
+            scheduled.append(page)
+        
+        # Download all pages at current level
+        results = await asyncio.gather(
+            *(_process_page(page, current_level, page is main_page) for page in scheduled),
+            return_exceptions=True
+        )
+        for page, result in zip(scheduled, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {page.original_url}: {str(result)}")
+        
+        # Move to next level; its pages are all queued, so start tracking the one after
+        next_keys.clear()
         
-        # Move to next level
-        current_level += 1
+        # Checkpoint between levels, while no page task is changing the crawl state
+        await asyncio.to_thread(
+            save_crawl_state, output_dir, args, downloaded_urls, current_level + 1, list(pages_queue)
+        )
     
     logger.info(f"\n=== Browser Download Summary ===")
     logger.info(f"Processed {len(downloaded_urls)} pages")
@@ -337,6 +570,56 @@ Examples:
         help='Run browser in headless mode (faster but more detectable, only with --browser)'
     )
     
+    parser.add_argument(
+        '--simulate-behavior',
+        action='store_true',
+        help='Simulate mouse and scroll activity on every page (slower, only with --browser in headful mode)'
+    )
+    
+    parser.add_argument(
+        '--revalidate',
+        action='store_true',
+        help='Re-check already downloaded files with conditional requests'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        help='Maximum sustained requests per second (default: 1 in HTTP mode, 5 with --browser)'
+    )
+    
+    parser.add_argument(
+        '--burst',
+        type=int,
+        default=1,
+        help='Requests allowed back to back after an idle spell before pacing resumes (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--limit-per-host',
+        type=int,
+        help='Maximum open connections to one host; --concurrent caps the total (default: --concurrent, at most 6, HTTP mode only)'
+    )
+    
+    parser.add_argument(
+        '--dns-cache-ttl',
+        type=int,
+        default=300,
+        help='Seconds to cache DNS lookups (default: 300, HTTP mode only)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted crawl of the same URL and snapshot from its last completed level'
+    )
+    
+    parser.add_argument(
+        '--uring',
+        action='store_true',
+        help='Write assets through io_uring on Linux (requires the liburing package, only with --browser)'
+    )
+    
     return parser.parse_args()
 
 
@@ -374,6 +657,11 @@ async def main():
     wayback_api = WaybackAPI()
     parser = AssetParser()
     
+    # Request pacing; each mode keeps its own default rate unless one is given
+    pacing = {'burst': args.burst}
+    if args.rate:
+        pacing['rate_limit'] = args.rate
+    
     try:
         if args.browser:
             # Browser mode
@@ -388,9 +676,16 @@ async def main():
                 output_dir=output_dir,
                 logger=logger,
                 headless=args.headless,
-                proxy=args.proxy
+                proxy=args.proxy,
+                max_concurrent=args.concurrent,
+                simulate_behavior=args.simulate_behavior,
+                revalidate=args.revalidate,
+                use_uring=args.uring,
+                **pacing
             ) as downloader:
-                await download_with_browser(downloader, wayback_api, parser, args, logger)
+                completed = await run_until_interrupted(
+                    download_with_browser(downloader, wayback_api, parser, args, logger, output_dir)
+                )
         else:
             # HTTP mode (original implementation)
             logger.info("Using HTTP mode for downloads")
@@ -399,12 +694,23 @@ async def main():
                 output_dir=output_dir,
                 max_concurrent=args.concurrent,
                 logger=logger,
-                proxy=args.proxy
+                proxy=args.proxy,
+                revalidate=args.revalidate,
+                limit_per_host=args.limit_per_host,
+                dns_cache_ttl=args.dns_cache_ttl,
+                **pacing
             ) as downloader:
-                await download_with_http(downloader, wayback_api, parser, args, logger)
+                completed = await run_until_interrupted(
+                    download_with_http(downloader, wayback_api, parser, args, logger, output_dir)
+                )
                 
             logger.info(f"Files saved to: {output_dir}")
         
+        # Queued writes were flushed when the downloader closed above
+        if not completed:
+            logger.info("Download interrupted by user; run again with --resume to continue")
+            sys.exit(1)
+        
     except KeyboardInterrupt:
         logger.info("Download interrupted by user")
         sys.exit(1)
@@ -413,7 +719,15 @@ async def main():
         if args.verbose:
             logger.exception("Full traceback:")
         sys.exit(1)
+    finally:
+        parser.close()
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    # Use the faster libuv-based event loop when it is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())